@@ -1,9 +1,15 @@
 """Research agents for the DeepResearch system."""
 
-from agents.planner import PlannerAgent
-from agents.executor import ExecutorAgent
-from agents.verifier import VerifierAgent
-from agents.synthesizer import SynthesizerAgent
+from importlib import import_module
+
+# Agents are imported on first access (PEP 562) so importing the package
+# does not pull in LangChain until an agent is actually needed
+_AGENT_MODULES = {
+    "PlannerAgent": "agents.planner",
+    "ExecutorAgent": "agents.executor",
+    "VerifierAgent": "agents.verifier",
+    "SynthesizerAgent": "agents.synthesizer",
+}
 
 __all__ = [
     "PlannerAgent",
@@ -11,3 +17,13 @@ __all__ = [
     "VerifierAgent",
     "SynthesizerAgent",
 ]
+
+
+def __getattr__(name):
+    if name in _AGENT_MODULES:
+        return getattr(import_module(_AGENT_MODULES[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,49 @@
+"""Shared sentence-embedding model for the semantic cache and source reranking."""
+
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from config import EMBEDDING_MODEL
+
+
+@lru_cache(maxsize=1)
+def get_encoder():
+    """Load the embedding model once per process, or None if unavailable."""
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        return None
+    try:
+        return SentenceTransformer(EMBEDDING_MODEL, device="cpu")
+    except Exception as e:
+        # Offline, hub blocked, disk full...: fall back to exact matching
+        print(f"Embedding model unavailable: {e}")
+        return None
+
+
+def embed_many(texts: Sequence[str]) -> Optional[List[Tuple[float, ...]]]:
+    """
+    Batch-encode texts into unit-length vectors.
+
+    Vectors are normalized, so similarity is a plain dot product.
+
+    Returns:
+        One vector per text, or None when no encoder is available
+    """
+    encoder = get_encoder()
+    if encoder is None:
+        return None
+    vectors = encoder.encode(list(texts), batch_size=32, convert_to_numpy=True, normalize_embeddings=True)
+    return [tuple(float(x) for x in vector) for vector in vectors]
+
+
+@lru_cache(maxsize=256)
+def embed(text: str) -> Optional[Tuple[float, ...]]:
+    """Encode a single text, memoized so repeated lookups of a query encode once."""
+    vectors = embed_many([text])
+    return vectors[0] if vectors else None
+
+
+def dot(a: Sequence[float], b: Sequence[float]) -> float:
+    """Similarity of two normalized vectors."""
+    return sum(x * y for x, y in zip(a, b))
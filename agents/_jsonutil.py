@@ -0,0 +1,139 @@
+"""JSON extraction helpers shared by agents that parse LLM responses."""
+
+import json
+import re
+from typing import Dict, List, Optional
+
+import orjson
+
+# Control characters other than \n, \r, \t (those are escaped instead)
+_CTRL_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+_CODEBLOCK_RE = re.compile(r'```(?:json)?\s*([\s\S]*?)```')
+_ESCAPE_TABLE = str.maketrans({'\n': '\\n', '\r': '\\r', '\t': '\\t'})
+
+
+def sanitize_json(text: str) -> str:
+    """Remove invalid control characters from JSON string."""
+    # Escape newlines/tabs in a single pass, then drop remaining control characters
+    return _CTRL_RE.sub('', text.translate(_ESCAPE_TABLE))
+
+
+def find_json_object(text: str) -> Optional[str]:
+    """
+    Locate the first balanced JSON object in text with a single scan.
+
+    Tracks brace depth while skipping over string literals (and escapes
+    inside them), so braces inside strings do not affect the match.
+
+    Returns:
+        The object substring, or None if no balanced object is found
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+def loads_json(text: str) -> Dict:
+    """Parse JSON with orjson, falling back to lenient stdlib parsing."""
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        pass
+    try:
+        # strict=False accepts raw control characters inside strings
+        return json.loads(text, strict=False)
+    except ValueError:
+        return json.loads(sanitize_json(text), strict=False)
+
+
+def extract_json(text: str) -> Dict:
+    """Extract JSON from text, handling markdown code blocks and control characters."""
+    text = text.strip()
+
+    # Remove markdown code blocks
+    if "```" in text:
+        match = _CODEBLOCK_RE.search(text)
+        if match:
+            text = match.group(1).strip()
+
+    return loads_json(find_json_object(text) or text)
+
+
+def parse_json_response(text: str) -> Dict:
+    """Parse a response expected to be a bare JSON object (Groq JSON mode)."""
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        # Fall back to tolerant extraction (code fences, stray prose)
+        return extract_json(text)
+
+
+class SectionStreamParser:
+    """
+    Incrementally parse a streamed JSON report.
+
+    Feed response chunks as they arrive; each call returns the objects that
+    were completed inside a top-level array (e.g. entries of "sections").
+    """
+
+    def __init__(self):
+        self._stack = []
+        self._item = None
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """Consume a chunk and return any array items it completed."""
+        completed = []
+        for ch in chunk:
+            if self._item is not None:
+                self._item.append(ch)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif not self._stack and ch != '{':
+                # Ignore any preamble before the top-level object
+                continue
+            elif ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                if ch == '{' and self._stack == ['{', '[']:
+                    self._item = [ch]
+                self._stack.append(ch)
+            elif ch in '}]':
+                if self._stack:
+                    self._stack.pop()
+                if ch == '}' and self._item is not None and self._stack == ['{', '[']:
+                    item_text = ''.join(self._item)
+                    self._item = None
+                    try:
+                        completed.append(loads_json(item_text))
+                    except ValueError:
+                        pass
+        return completed
@@ -0,0 +1,181 @@
+"""Semantic response cache for agent LLM calls.
+
+Results are stored in SQLite alongside an embedding of the normalized query,
+so a repeated or near-duplicate query can reuse an earlier result instead of
+paying for another LLM round trip.
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from functools import lru_cache, partial
+from typing import Any, Dict, Optional
+
+import orjson
+
+from agents._embed import dot, embed
+from config import (
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_PATH,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL,
+)
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so trivially different queries match."""
+    return " ".join(query.lower().split())
+
+
+def hash_text(text: str) -> str:
+    """Stable hash used to key cache entries on large context (e.g. findings)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SemanticCache:
+    """SQLite-backed cache matching queries by embedding similarity."""
+
+    def __init__(self, path: str = SEMANTIC_CACHE_PATH, threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 ttl: int = SEMANTIC_CACHE_TTL, enabled: bool = SEMANTIC_CACHE_ENABLED):
+        self.path = path
+        self.threshold = threshold
+        self.ttl = ttl
+        self.enabled = enabled
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database lazily and create the schema on first use."""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache (
+                    id INTEGER PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    embedding BLOB,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_lookup ON cache (namespace, key)")
+            self._conn.commit()
+        return self._conn
+
+    def get(self, namespace: str, query: str, key: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result for a query.
+
+        Best effort: any failure (database, embedding model) is logged and
+        treated as a miss, so a broken cache never fails the caller.
+
+        Args:
+            namespace: Cache namespace (agent name, optionally per session)
+            query: User query to match semantically
+            key: Exact-match key for extra context, e.g. a findings hash
+
+        Returns:
+            Cached result dict, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        try:
+            return self._lookup(namespace, query, key)
+        except Exception as e:
+            print(f"Semantic cache read error: {e}")
+            return None
+
+    def set(self, namespace: str, query: str, value: Dict[str, Any], key: str = ""):
+        """Store a result for a query and drop expired entries (best effort, like get)."""
+        if not self.enabled:
+            return
+        try:
+            self._store(namespace, query, value, key)
+        except Exception as e:
+            print(f"Semantic cache write error: {e}")
+
+    async def aget(self, namespace: str, query: str, key: str = "") -> Optional[Dict[str, Any]]:
+        """get on a worker thread, so embedding and SQLite work never block the event loop."""
+        if not self.enabled:
+            return None
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, partial(self.get, namespace, query, key))
+
+    async def aset(self, namespace: str, query: str, value: Dict[str, Any], key: str = ""):
+        """set on a worker thread, like aget."""
+        if not self.enabled:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, partial(self.set, namespace, query, value, key))
+
+    def _lookup(self, namespace: str, query: str, key: str) -> Optional[Dict[str, Any]]:
+        normalized = normalize_query(query)
+        cutoff = time.time() - self.ttl
+
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT query, embedding, payload FROM cache "
+                "WHERE namespace = ? AND key = ? AND created_at >= ? ORDER BY created_at DESC",
+                (namespace, key, cutoff),
+            ).fetchall()
+
+        if not rows:
+            return None
+
+        # Exact match needs no embedding at all
+        for cached_query, _, payload in rows:
+            if cached_query == normalized:
+                return orjson.loads(payload)
+
+        embedding = embed(normalized)
+        if embedding is None:
+            return None
+
+        best_payload, best_score = None, 0.0
+        for _, blob, payload in rows:
+            if blob is None:
+                continue
+            vector = array("f")
+            vector.frombytes(blob)
+            score = dot(embedding, vector)
+            if score > best_score:
+                best_payload, best_score = payload, score
+
+        if best_payload is not None and best_score >= self.threshold:
+            return orjson.loads(best_payload)
+        return None
+
+    def _store(self, namespace: str, query: str, value: Dict[str, Any], key: str):
+        normalized = normalize_query(query)
+        try:
+            embedding = embed(normalized)
+        except Exception as e:
+            # Still store the entry; it can be matched exactly, just not semantically
+            print(f"Semantic cache embedding error: {e}")
+            embedding = None
+        blob = array("f", embedding).tobytes() if embedding is not None else None
+        now = time.time()
+
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM cache WHERE created_at < ?", (now - self.ttl,))
+            conn.execute(
+                "INSERT INTO cache (namespace, key, query, embedding, payload, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, key, normalized, blob, orjson.dumps(value).decode(), now),
+            )
+            conn.commit()
+
+
+@lru_cache(maxsize=1)
+def get_cache() -> SemanticCache:
+    """Return the process-wide semantic cache."""
+    return SemanticCache()
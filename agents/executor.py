@@ -1,26 +1,51 @@
 """Executor Agent - Executes research plan using tools."""
 
-import json
-import re
-import time
+import asyncio
+import copy
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Callable
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from config import GROQ_API_KEY, MODEL_NAME, TEMPERATURE, rate_limit_delay
-from models.schemas import ResearchFindings, SourceInfo
+from cachetools import LRUCache
+from config import TOOL_TIMEOUT
+from llm import ainvoke_llm, get_llm
+from agents._jsonutil import extract_json
+from agents._semcache import normalize_query
 from tools import tavily_search, arxiv_search, wikipedia_search, calculator, python_executor
+from tools._cache import _is_error
+
+# Dedicated pool for blocking tool calls. Unlike the loop's default executor,
+# asyncio.run() does not join it on shutdown, so a hung call cannot stall a run.
+_TOOL_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="tool")
+
+# Most (tool, query) calls an agent remembers; the least recently used go first
+TOOL_MEMO_SIZE = 256
+
+
+def _id_key(subtask_id: Any) -> str:
+    """Normalize a subtask id, so the model returning "2" for 2 still matches."""
+    try:
+        return str(int(subtask_id))
+    except (TypeError, ValueError):
+        return str(subtask_id).strip()
 
 
 class ExecutorAgent:
     """Agent that executes research using available tools."""
     
     def __init__(self):
-        self.llm = ChatGroq(
-            api_key=GROQ_API_KEY,
-            model_name=MODEL_NAME,
-            temperature=TEMPERATURE,
-            max_retries=3,
-        )
+        from langchain_core.prompts import ChatPromptTemplate
+        
+        # JSON mode guarantees a parseable object for the batched summaries
+        self.llm = get_llm(json_mode=True)
+        
+        self.synthesis_prompt = ChatPromptTemplate.from_messages([
+            ("system", """You summarize research data for several subtasks at once.
+For EACH subtask, summarize its research data into 2-3 detailed paragraphs.
+Be specific and informative. Include facts, definitions, and key insights.
+Respond with ONLY a JSON object containing exactly one entry per subtask:
+{{"results": [{{"subtask_id": 1, "findings": "Your detailed summary here...", "key_points": ["point1", "point2"]}}]}}"""),
+            ("human", "{subtasks}")
+        ])
+        self.synthesis_chain = self.synthesis_prompt | self.llm
         
         # Available tools
         self.tools: Dict[str, Callable] = {
@@ -30,170 +55,207 @@ class ExecutorAgent:
             "calculator": calculator,
             "python": python_executor,
         }
+        
+        # Tool calls for this session, keyed by (tool, normalized query). Each entry
+        # is the task running the call, so overlapping subtasks and the prewarm
+        # share one round trip per query even while it is still in flight. Only
+        # touched from the event loop, so it needs no lock
+        self._tool_cache: LRUCache = LRUCache(maxsize=TOOL_MEMO_SIZE)
+    
+    def prewarm(self, query: str) -> None:
+        """
+        Speculatively search the raw user query while the planner is running.
+        
+        Starts the searches in the background and returns immediately (call it
+        from the event loop). The subtask collected with also_search set to the
+        same query joins the in-flight calls, so their results reach the
+        summary without costing another tool round trip.
+        """
+        for name in ("tavily", "wikipedia"):
+            self._tool_task(name, query)
+    
+    def _tool_task(self, name: str, query: str) -> asyncio.Task:
+        """Return the task running a tool call, starting it on first request."""
+        key = (name, normalize_query(query))
+        task = self._tool_cache.get(key)
+        if task is None:
+            task = self._tool_cache[key] = asyncio.ensure_future(self._run_tool(name, query))
+        return task
     
-    def _sanitize_json(self, text: str) -> str:
-        """Remove invalid control characters from JSON string."""
-        # Remove control characters except valid JSON ones (\n, \r, \t)
-        import re
-        # Replace actual newlines/tabs with escaped versions first
-        text = text.replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-        # Remove other control characters (0x00-0x1F except already handled)
-        text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f]', '', text)
-        return text
+    def _forget_tool_task(self, name: str, query: str, task: asyncio.Task) -> None:
+        """Drop a failed call from the cache so a later request retries it."""
+        key = (name, normalize_query(query))
+        if self._tool_cache.get(key) is task:
+            del self._tool_cache[key]
     
-    def _extract_json(self, text: str) -> Dict:
-        """Extract JSON from text with sanitization."""
-        text = text.strip()
-        
-        # Remove markdown code blocks
-        if "```" in text:
-            matches = re.findall(r'```(?:json)?\s*([\s\S]*?)```', text)
-            if matches:
-                text = matches[0].strip()
-        
-        # Try to find JSON object
-        match = re.search(r'\{[\s\S]*\}', text)
-        if match:
-            json_str = match.group()
-            # Sanitize before parsing
-            json_str = self._sanitize_json(json_str)
-            try:
-                return json.loads(json_str)
-            except:
-                # Try with strict=False
-                return json.loads(json_str, strict=False)
-        
-        # Sanitize and parse
-        text = self._sanitize_json(text)
-        return json.loads(text, strict=False)
+    async def _run_tool(self, name: str, query: str) -> Any:
+        """
+        Call a tool in a worker thread.
+        
+        Calls are capped at TOOL_TIMEOUT seconds; timeouts and failures are
+        returned as {"error": ...} so one slow tool cannot hold up the plan.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(_TOOL_POOL, self.tools[name], query),
+                timeout=TOOL_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            return {"error": f"{name} timed out after {TOOL_TIMEOUT:g}s"}
+        except Exception as e:
+            return {"error": f"{name} failed: {str(e)}"}
+    
+    async def _acall_tool(self, name: str, query: str) -> Any:
+        """Run a tool call, or join the identical call already started; returns a private copy."""
+        task = self._tool_task(name, query)
+        # Shielded, so a caller that times out does not cancel the call for everyone else
+        result = await asyncio.shield(task)
+        
+        if _is_error(result):
+            self._forget_tool_task(name, query, task)
+        return copy.deepcopy(result)
+    
+    def _raw_findings_text(self, query: str, results: List[Dict[str, Any]]) -> str:
+        """Build findings text straight from raw tool results."""
+        parts = [f"Research on {query}:\n\n"]
+        for r in results[:3]:
+            if isinstance(r, dict) and r.get("_body"):
+                parts.append(f"{r['_body'][:400]}\n\n")
+        return "".join(parts)
     
-    def execute_subtask(self, subtask: Dict[str, Any], previous_findings: str = "") -> Dict[str, Any]:
-        """Execute a single research subtask by calling tools directly."""
+    async def acollect_subtask(self, subtask: Dict[str, Any], also_search: str = None) -> Dict[str, Any]:
+        """
+        Run a subtask's tools concurrently and collect their raw results.
+        
+        Args:
+            subtask: Subtask from the research plan
+            also_search: Extra query searched alongside the subtask (the prewarmed
+                user query), whose results are collected with the subtask's own
+            
+        Returns:
+            Dict with raw tool "results", citation "sources" and tool "errors"
+        """
         all_results = []
         sources = []
+        errors = []
         
         tools_to_try = subtask.get("tools_needed", ["tavily", "wikipedia"])
         query = subtask.get("description", "")
         
-        # Execute each tool directly without LLM decision (faster, no rate limits)
-        for tool_name in tools_to_try[:2]:  # Limit to 2 tools per subtask
-            try:
-                tool_func = self.tools.get(tool_name)
-                if not tool_func:
-                    continue
-                    
-                # Create appropriate query for each tool
-                if tool_name == "calculator":
-                    continue  # Skip calculator unless specifically needed
-                elif tool_name == "python":
-                    continue  # Skip python executor for now
-                
-                result = tool_func(query)
-                
-                if isinstance(result, list):
-                    for r in result:
-                        if isinstance(r, dict) and "error" not in r:
-                            all_results.append(r)
-                            sources.append(SourceInfo(
-                                title=r.get("title", "Source"),
-                                url=r.get("url"),
-                                source_type=r.get("source_type", "web"),
-                                snippet=str(r.get("content", r.get("abstract", r.get("summary", ""))))[:400]
-                            ))
-                elif isinstance(result, dict) and "error" not in result:
-                    all_results.append(result)
-                    
-            except Exception as e:
-                print(f"Tool {tool_name} error: {e}")
-                continue
+        # Skip calculator and python executor, which need inputs the plan does not provide
+        calls = {
+            (name, normalize_query(query)): (name, query) for name in tools_to_try
+            if name in self.tools and name not in ("calculator", "python")
+        }
+        if also_search:
+            for name in ("tavily", "wikipedia"):
+                calls.setdefault((name, normalize_query(also_search)), (name, also_search))
         
-        # Synthesize findings using LLM
-        rate_limit_delay()
+        # Tools are blocking I/O, so run them in threads and wait for all of them at once;
+        # every call is time-boxed, so the slowest tool bounds the wait
+        tool_results = await asyncio.gather(
+            *[self._acall_tool(name, q) for name, q in calls.values()],
+            return_exceptions=True,
+        )
         
-        try:
-            synthesis_prompt = ChatPromptTemplate.from_messages([
-                ("system", """Summarize the research findings into 2-3 detailed paragraphs.
-Be specific and informative. Include facts, definitions, and key insights.
-Respond with ONLY a JSON object:
-{{"findings": "Your detailed summary here...", "key_points": ["point1", "point2"]}}"""),
-                ("human", "Task: {task}\n\nResearch Data:\n{data}")
-            ])
-            
-            # Prepare data text
-            data_text = ""
-            for r in all_results[:5]:
-                if isinstance(r, dict):
-                    title = r.get("title", "")
-                    content = r.get("content", r.get("abstract", r.get("summary", "")))
-                    if content:
-                        data_text += f"\n[{title}]: {str(content)[:500]}\n"
-            
-            if not data_text.strip():
-                data_text = f"Topic: {query}. Provide general knowledge about this topic."
+        for (tool_name, _), result in zip(calls.values(), tool_results):
+            # A failing tool is reported but never aborts the rest of the subtask
+            if isinstance(result, Exception):
+                result = {"error": str(result)}
+            if isinstance(result, dict) and "error" in result:
+                print(f"Tool {tool_name} error: {result['error']}")
+                errors.append(f"{tool_name}: {result['error']}")
+                continue
             
-            chain = synthesis_prompt | self.llm
-            response = chain.invoke({"task": query, "data": data_text})
+            if isinstance(result, list):
+                for r in result:
+                    if isinstance(r, dict) and "error" in r:
+                        print(f"Tool {tool_name} error: {r['error']}")
+                        errors.append(f"{tool_name}: {r['error']}")
+                    elif isinstance(r, dict):
+                        # Resolve the text body once; prompt builders slice it later
+                        r["_body"] = str(r.get("content") or r.get("abstract") or r.get("summary") or "")
+                        all_results.append(r)
+                        sources.append({
+                            "title": r.get("title", "Source"),
+                            "url": r.get("url"),
+                            "source_type": r.get("source_type", "web"),
+                            "snippet": r["_body"][:400]
+                        })
+            elif isinstance(result, dict):
+                result["_body"] = str(result.get("content") or result.get("abstract") or result.get("summary") or "")
+                all_results.append(result)
+        
+        return {"results": all_results, "sources": sources, "errors": errors}
+    
+    def _data_text(self, query: str, results: List[Dict[str, Any]]) -> str:
+        """Format raw tool results as prompt data for one subtask."""
+        data_parts = []
+        for r in results[:5]:
+            if isinstance(r, dict) and r.get("_body"):
+                data_parts.append(f"\n[{r.get('title', '')}]: {r['_body'][:500]}\n")
+        data_text = "".join(data_parts)
+        
+        if not data_text.strip():
+            data_text = f"Topic: {query}. Provide general knowledge about this topic."
+        return data_text
+    
+    async def asynthesize_all(self, subtasks: List[Dict[str, Any]],
+                              raw_results_by_id: Dict[int, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Summarize the raw results of every subtask in a single LLM call.
+        
+        Args:
+            subtasks: Subtasks from the research plan
+            raw_results_by_id: acollect_subtask output keyed by subtask id
             
-            synthesis = self._extract_json(response.content)
-            findings_text = synthesis.get("findings", "")
+        Returns:
+            One findings dict per subtask, in plan order
+        """
+        summaries: Dict[int, str] = {}
+        
+        try:
+            blocks = []
+            for subtask in subtasks:
+                subtask_id = subtask.get("id", 1)
+                query = subtask.get("description", "")
+                raw = raw_results_by_id.get(subtask_id, {})
+                blocks.append(
+                    f"Subtask {subtask_id}: {query}\n\n"
+                    f"Research Data:\n{self._data_text(query, raw.get('results', []))}"
+                )
             
-            if not findings_text or len(findings_text) < 50:
-                # Use raw data if synthesis failed
-                findings_text = f"Research on {query}:\n\n"
-                for r in all_results[:3]:
-                    if isinstance(r, dict):
-                        content = r.get("content", r.get("abstract", r.get("summary", "")))
-                        if content:
-                            findings_text += f"{str(content)[:400]}\n\n"
-            
-            return {
-                "subtask_id": subtask.get("id", 1),
-                "findings": findings_text,
-                "sources": [s.model_dump() for s in sources],
-                "code_examples": None,
-                "needs_more_research": False
-            }
+            response = await ainvoke_llm(self.synthesis_chain, {"subtasks": "\n\n---\n\n".join(blocks)})
             
+            synthesis = extract_json(response.content)
+            for entry in synthesis.get("results", []):
+                if isinstance(entry, dict) and entry.get("findings"):
+                    summaries[_id_key(entry.get("subtask_id"))] = entry["findings"]
+        
         except Exception as e:
             print(f"Synthesis error: {e}")
-            # Fallback: Return raw findings
-            findings_text = f"Research on {query}:\n\n"
-            for r in all_results[:3]:
-                if isinstance(r, dict):
-                    content = r.get("content", r.get("abstract", r.get("summary", "")))
-                    if content:
-                        findings_text += f"{str(content)[:400]}\n\n"
+        
+        findings = []
+        for subtask in subtasks:
+            subtask_id = subtask.get("id", 1)
+            query = subtask.get("description", "")
+            raw = raw_results_by_id.get(subtask_id, {})
+            sources = raw.get("sources", [])
             
+            findings_text = summaries.get(_id_key(subtask_id), "")
             if len(findings_text) < 50:
-                findings_text = f"Explored {query}. Found {len(sources)} relevant sources."
+                # Use raw data if synthesis failed or skipped this subtask
+                findings_text = self._raw_findings_text(query, raw.get("results", []))
+                if len(findings_text) < 50:
+                    findings_text = f"Explored {query}. Found {len(sources)} relevant sources."
             
-            return {
-                "subtask_id": subtask.get("id", 1),
+            findings.append({
+                "subtask_id": subtask_id,
                 "findings": findings_text,
-                "sources": [s.model_dump() for s in sources],
+                "sources": sources,
                 "code_examples": None,
                 "needs_more_research": False
-            }
-    
-    def execute_plan(self, plan: Dict[str, Any], callback: Callable = None) -> List[Dict[str, Any]]:
-        """Execute all subtasks in a research plan."""
-        all_findings = []
-        previous_summary = ""
-        
-        subtasks = plan.get("subtasks", [])
-        
-        for i, subtask in enumerate(subtasks):
-            if callback:
-                callback(f"Executing subtask {i+1}/{len(subtasks)}: {subtask.get('description', '')[:50]}...")
-            
-            findings = self.execute_subtask(subtask, previous_summary)
-            all_findings.append(findings)
-            
-            # Update previous summary for context
-            if findings.get("findings"):
-                previous_summary += f"\n- {findings['findings'][:200]}"
-            
-            # Small delay between subtasks
-            time.sleep(0.3)
+            })
         
-        return all_findings
+        return findings
@@ -2,21 +2,21 @@
 
 import json
 from typing import Dict, Any
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from config import GROQ_API_KEY, MODEL_NAME, TEMPERATURE
+from llm import ainvoke_llm, get_llm, run_async
+from agents._jsonutil import parse_json_response
 from models.schemas import ResearchPlan
+from agents._semcache import get_cache
 
 
 class PlannerAgent:
     """Agent that creates structured research plans from user queries."""
     
-    def __init__(self):
-        self.llm = ChatGroq(
-            api_key=GROQ_API_KEY,
-            model_name=MODEL_NAME,
-            temperature=TEMPERATURE,
-        )
+    def __init__(self, cache_namespace: str = None):
+        from langchain_core.prompts import ChatPromptTemplate
+        
+        self.cache = get_cache()
+        self.cache_namespace = f"{cache_namespace}:planner" if cache_namespace else "planner"
+        self.llm = get_llm(json_mode=True)
         
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """You are a Research Planner Agent. Your job is to analyze research queries and create structured plans.
@@ -57,38 +57,42 @@ Respond ONLY with the JSON object, no additional text."""),
             ("human", "Research Query: {query}")
         ])
     
-    def plan(self, query: str) -> Dict[str, Any]:
+    def plan(self, query: str, use_cache: bool = True) -> Dict[str, Any]:
         """
         Create a research plan for the given query.
         
         Args:
             query: User's research query
+            use_cache: Set False to bypass the semantic cache (e.g. sensitive prompts)
             
         Returns:
             Structured research plan
         """
+        return run_async(self.plan_async(query, use_cache=use_cache))
+    
+    async def plan_async(self, query: str, use_cache: bool = True) -> Dict[str, Any]:
+        """Async variant of plan, so planning can overlap with other I/O."""
+        if use_cache:
+            cached = await self.cache.aget(self.cache_namespace, query)
+            if cached:
+                return {"success": True, "plan": cached}
+        
         try:
             chain = self.prompt | self.llm
-            response = chain.invoke({"query": query})
+            response = await ainvoke_llm(chain, {"query": query})
             
-            # Parse the JSON response
-            content = response.content.strip()
-            
-            # Handle potential markdown code blocks
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
-            
-            plan_dict = json.loads(content)
+            # JSON mode returns a bare object, so no code-fence stripping is needed
+            plan_dict = parse_json_response(response.content)
             
             # Validate with Pydantic
-            plan = ResearchPlan(**plan_dict)
+            plan = ResearchPlan(**plan_dict).model_dump()
+            
+            if use_cache:
+                await self.cache.aset(self.cache_namespace, query, plan)
             
             return {
                 "success": True,
-                "plan": plan.model_dump()
+                "plan": plan
             }
             
         except json.JSONDecodeError as e:
@@ -1,98 +1,39 @@
 """Synthesizer Agent - Compiles research into final reports."""
 
-import json
-import re
-import time
 from datetime import datetime
-from typing import Dict, Any, List
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from config import GROQ_API_KEY, MODEL_NAME, rate_limit_delay
+from typing import Dict, Any, List, Callable
+from pydantic import TypeAdapter, ValidationError
+from llm import get_llm, invoke_llm, stream_llm
+from agents._jsonutil import SectionStreamParser, extract_json, parse_json_response
+from agents._semcache import get_cache, hash_text
+from models.schemas import SourceInfo
+
+# Sources arrive as plain dicts from the executor; validate them once, in bulk
+_SOURCES_ADAPTER = TypeAdapter(List[SourceInfo])
+
+
+def _source_key(source: Dict[str, Any]) -> Any:
+    """Dedup key for a source: its URL, else its title and snippet, else the source itself."""
+    if source.get("url"):
+        return source["url"]
+    if source.get("title") or source.get("snippet"):
+        return (source.get("title"), source.get("snippet"))
+    # Nothing to identify it by, so it is never merged with another source
+    return id(source)
 
 
 class SynthesizerAgent:
     """Agent that synthesizes research findings into comprehensive reports."""
     
-    def __init__(self):
-        self.llm = ChatGroq(
-            api_key=GROQ_API_KEY,
-            model_name=MODEL_NAME,
-            temperature=0.3,
-            max_tokens=4000,
-            max_retries=3,
-        )
-    
-    def _sanitize_json(self, text: str) -> str:
-        """Remove invalid control characters from JSON string."""
-        # Replace actual newlines/tabs with escaped versions first
-        text = text.replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-        # Remove other control characters (0x00-0x1F except already handled)
-        text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f]', '', text)
-        return text
-    
-    def _extract_json(self, text: str) -> Dict:
-        """Extract JSON from text, handling various formats with sanitization."""
-        text = text.strip()
-        
-        # Remove markdown code blocks
-        if "```" in text:
-            matches = re.findall(r'```(?:json)?\s*([\s\S]*?)```', text)
-            if matches:
-                text = matches[0].strip()
-        
-        # Find JSON object pattern
-        match = re.search(r'\{[\s\S]*\}', text)
-        if match:
-            json_str = match.group()
-            json_str = self._sanitize_json(json_str)
-            try:
-                return json.loads(json_str)
-            except:
-                return json.loads(json_str, strict=False)
-        
-        # Sanitize and parse
-        text = self._sanitize_json(text)
-        return json.loads(text, strict=False)
-    
-    def synthesize(self, query: str, plan: Dict[str, Any], findings: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Synthesize findings into a final report."""
-        
-        # Compile all sources
-        all_sources = []
-        source_index = 1
-        for f in findings:
-            for source in f.get("sources", []):
-                if isinstance(source, dict):
-                    source_copy = source.copy()
-                    source_copy["index"] = source_index
-                    all_sources.append(source_copy)
-                    source_index += 1
-        
-        # Build comprehensive findings text
-        findings_text = ""
-        for f in findings:
-            content = f.get("findings", "")
-            if content and len(content) > 20:
-                findings_text += f"\n\n{content}\n"
-        
-        if not findings_text.strip():
-            findings_text = f"Topic: {query}. Provide comprehensive information about this topic."
-        
-        # Build sources text for citations
-        sources_text = ""
-        for s in all_sources[:15]:
-            idx = s.get('index', 1)
-            title = s.get('title', 'Source')
-            url = s.get('url', '')
-            sources_text += f"[{idx}] {title}"
-            if url:
-                sources_text += f" - {url}"
-            sources_text += "\n"
+    def __init__(self, cache_namespace: str = None):
+        from langchain_core.prompts import ChatPromptTemplate
         
-        rate_limit_delay()
+        self.cache = get_cache()
+        self.cache_namespace = f"{cache_namespace}:synthesizer" if cache_namespace else "synthesizer"
+        self.llm = get_llm(temperature=0.3, max_tokens=4000)
         
         # Use a simpler, more reliable prompt
-        prompt = ChatPromptTemplate.from_messages([
+        self.prompt = ChatPromptTemplate.from_messages([
             ("system", """You are a research report writer. Create a comprehensive report.
 
 Output ONLY valid JSON in this exact format:
@@ -123,16 +64,92 @@ Available Sources:
 
 Generate the research report JSON:""")
         ])
+        self.chain = self.prompt | self.llm
+        
+        # Fallback prompt used when the primary one fails
+        self.simple_prompt = ChatPromptTemplate.from_messages([
+            ("system", "Create a JSON report with title, executive_summary, and sections array. Each section has heading and content."),
+            ("human", "Write a report about: {query}\n\nData: {findings}\n\nJSON:")
+        ])
+        # The retry is not streamed, so it can use JSON mode
+        self.simple_chain = self.simple_prompt | get_llm(temperature=0.3, max_tokens=4000, json_mode=True)
+    
+    def synthesize(self, query: str, plan: Dict[str, Any], findings: List[Dict[str, Any]],
+                   use_cache: bool = True, callback: Callable[[Dict[str, Any]], None] = None) -> Dict[str, Any]:
+        """
+        Synthesize findings into a final report.
+        
+        Args:
+            query: Original user query
+            plan: Research plan
+            findings: List of research findings
+            use_cache: Set False to bypass the semantic cache
+            callback: Optional callback(section) invoked as each section finishes streaming
+            
+        Returns:
+            Final report
+        """
+        
+        # Compile all sources, deduplicated by URL (or title and snippet) in
+        # first-seen order, so a page found by several subtasks is cited once
+        unique_sources = {}
+        for f in findings:
+            for source in f.get("sources", []):
+                if isinstance(source, dict):
+                    unique_sources.setdefault(_source_key(source), source)
+        all_sources = [
+            {**source, "index": index}
+            for index, source in enumerate(unique_sources.values(), 1)
+        ]
+        
+        try:
+            _SOURCES_ADAPTER.validate_python(all_sources)
+        except ValidationError as e:
+            print(f"Source validation warning: {e}")
+        
+        # Build comprehensive findings text
+        findings_parts = []
+        for f in findings:
+            content = f.get("findings", "")
+            if content and len(content) > 20:
+                findings_parts.append(f"\n\n{content}\n")
+        findings_text = "".join(findings_parts)
+        
+        if not findings_text.strip():
+            findings_text = f"Topic: {query}. Provide comprehensive information about this topic."
+        
+        # Build sources text for citations
+        source_lines = []
+        for s in all_sources[:15]:
+            idx = s.get('index', 1)
+            title = s.get('title', 'Source')
+            url = s.get('url', '')
+            source_lines.append(f"[{idx}] {title} - {url}\n" if url else f"[{idx}] {title}\n")
+        sources_text = "".join(source_lines)
+        
+        # Only reuse a report written from the same findings and sources
+        cache_key = hash_text(findings_text + sources_text)
+        if use_cache:
+            cached = self.cache.get(self.cache_namespace, query, key=cache_key)
+            if cached:
+                return {"success": True, "report": cached}
         
         try:
-            chain = prompt | self.llm
-            response = chain.invoke({
+            # Stream the response so sections can be surfaced as soon as they close
+            parser = SectionStreamParser()
+            chunks = []
+            for chunk in stream_llm(self.chain, {
                 "query": query,
                 "findings": findings_text[:3000],  # Limit to avoid token issues
                 "sources": sources_text if sources_text else "General knowledge sources"
-            })
+            }):
+                chunks.append(chunk.content)
+                if callback:
+                    for section in parser.feed(chunk.content):
+                        if isinstance(section, dict) and section.get("content"):
+                            callback(section)
             
-            report_dict = self._extract_json(response.content)
+            report_dict = extract_json("".join(chunks))
             
             # Validate and extract sections
             sections = report_dict.get("sections", [])
@@ -150,49 +167,48 @@ Generate the research report JSON:""")
             if not valid_sections:
                 raise ValueError("No valid sections")
             
+            report = {
+                "title": report_dict.get("title", f"Research Report: {query}"),
+                "executive_summary": report_dict.get("executive_summary", f"This report examines {query} in detail."),
+                "sections": valid_sections,
+                "references": all_sources,
+                "generated_at": datetime.now().isoformat()
+            }
+            if use_cache:
+                self.cache.set(self.cache_namespace, query, report, key=cache_key)
+            
             return {
                 "success": True,
-                "report": {
-                    "title": report_dict.get("title", f"Research Report: {query}"),
-                    "executive_summary": report_dict.get("executive_summary", f"This report examines {query} in detail."),
-                    "sections": valid_sections,
-                    "references": all_sources,
-                    "generated_at": datetime.now().isoformat()
-                }
+                "report": report
             }
             
         except Exception as e:
             print(f"Synthesizer primary error: {e}")
             
-            # TRY AGAIN with even simpler prompt
-            rate_limit_delay()
-            rate_limit_delay()  # Extra delay
-            
+            # TRY AGAIN with even simpler prompt (the limiter backs off if we hit a 429)
             try:
-                simple_prompt = ChatPromptTemplate.from_messages([
-                    ("system", "Create a JSON report with title, executive_summary, and sections array. Each section has heading and content."),
-                    ("human", "Write a report about: {query}\n\nData: {findings}\n\nJSON:")
-                ])
-                
-                chain = simple_prompt | self.llm
-                response = chain.invoke({
+                response = invoke_llm(self.simple_chain, {
                     "query": query,
                     "findings": findings_text[:2000]
                 })
                 
-                report_dict = self._extract_json(response.content)
+                report_dict = parse_json_response(response.content)
                 sections = report_dict.get("sections", [])
                 
                 if sections:
+                    report = {
+                        "title": report_dict.get("title", f"Research Report: {query}"),
+                        "executive_summary": report_dict.get("executive_summary", ""),
+                        "sections": sections,
+                        "references": all_sources,
+                        "generated_at": datetime.now().isoformat()
+                    }
+                    if use_cache:
+                        self.cache.set(self.cache_namespace, query, report, key=cache_key)
+                    
                     return {
                         "success": True,
-                        "report": {
-                            "title": report_dict.get("title", f"Research Report: {query}"),
-                            "executive_summary": report_dict.get("executive_summary", ""),
-                            "sections": sections,
-                            "references": all_sources,
-                            "generated_at": datetime.now().isoformat()
-                        }
+                        "report": report
                     }
             except Exception as e2:
                 print(f"Synthesizer retry error: {e2}")
@@ -211,7 +227,8 @@ Generate the research report JSON:""")
                 content = f.get("findings", "")
                 if content and len(content) > 50:
                     # Generate a heading from the first line or sentence
-                    first_sentence = content.split('.')[0][:60] if '.' in content else content[:60]
+                    idx = content.find('.')
+                    first_sentence = content[:idx if 0 <= idx < 60 else 60]
                     sections.append({
                         "heading": f"Research Findings: {first_sentence}...",
                         "content": content
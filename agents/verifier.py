@@ -1,22 +1,22 @@
 """Verifier Agent - Reviews and validates research findings."""
 
-import json
+import orjson
 from typing import Dict, Any, List
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from config import GROQ_API_KEY, MODEL_NAME, TEMPERATURE
+from llm import ainvoke_llm, get_llm, run_async
+from agents._jsonutil import parse_json_response
 from models.schemas import VerificationResult
+from agents._semcache import get_cache, hash_text
 
 
 class VerifierAgent:
     """Agent that verifies research completeness and accuracy."""
     
-    def __init__(self):
-        self.llm = ChatGroq(
-            api_key=GROQ_API_KEY,
-            model_name=MODEL_NAME,
-            temperature=TEMPERATURE,
-        )
+    def __init__(self, cache_namespace: str = None):
+        from langchain_core.prompts import ChatPromptTemplate
+        
+        self.cache = get_cache()
+        self.cache_namespace = f"{cache_namespace}:verifier" if cache_namespace else "verifier"
+        self.llm = get_llm(json_mode=True)
         
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """You are a Research Verifier Agent. Your job is to review research findings for completeness and accuracy.
@@ -57,7 +57,8 @@ Number of Sources: {source_count}
 Evaluate this research:""")
         ])
     
-    def verify(self, query: str, plan: Dict[str, Any], findings: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def verify(self, query: str, plan: Dict[str, Any], findings: List[Dict[str, Any]],
+               use_cache: bool = True) -> Dict[str, Any]:
         """
         Verify research findings.
         
@@ -65,44 +66,54 @@ Evaluate this research:""")
             query: Original user query
             plan: Research plan
             findings: List of research findings
+            use_cache: Set False to bypass the semantic cache
             
         Returns:
             Verification result
         """
+        return run_async(self.verify_async(query, plan, findings, use_cache=use_cache))
+    
+    async def verify_async(self, query: str, plan: Dict[str, Any], findings: List[Dict[str, Any]],
+                           use_cache: bool = True) -> Dict[str, Any]:
+        """Async variant of verify."""
         try:
             # Count total sources
             source_count = sum(len(f.get("sources", [])) for f in findings)
             
             # Format findings for review
-            findings_text = ""
-            for f in findings:
-                findings_text += f"\n\nSubtask {f.get('subtask_id', 'N/A')}:\n"
-                findings_text += f"{f.get('findings', 'No findings')}\n"
-                findings_text += f"Sources: {len(f.get('sources', []))}"
+            findings_text = "".join(
+                f"\n\nSubtask {f.get('subtask_id', 'N/A')}:\n"
+                f"{f.get('findings', 'No findings')}\n"
+                f"Sources: {len(f.get('sources', []))}"
+                for f in findings
+            )
+            
+            # Only reuse a verdict for the same query over the same findings
+            cache_key = hash_text(findings_text)
+            if use_cache:
+                cached = await self.cache.aget(self.cache_namespace, query, key=cache_key)
+                if cached:
+                    return {"success": True, "verification": cached}
             
             chain = self.prompt | self.llm
-            response = chain.invoke({
+            response = await ainvoke_llm(chain, {
                 "query": query,
-                "plan": json.dumps(plan, indent=2),
+                "plan": orjson.dumps(plan).decode(),  # Compact: fewer prompt tokens than indent=2
                 "findings": findings_text,
                 "source_count": source_count
             })
             
-            content = response.content.strip()
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-                content = content.strip()
-            
-            result_dict = json.loads(content)
+            result_dict = parse_json_response(response.content)
             
             # Validate with Pydantic
-            result = VerificationResult(**result_dict)
+            result = VerificationResult(**result_dict).model_dump()
+            
+            if use_cache:
+                await self.cache.aset(self.cache_namespace, query, result, key=cache_key)
             
             return {
                 "success": True,
-                "verification": result.model_dump()
+                "verification": result
             }
             
         except Exception as e:
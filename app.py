@@ -6,19 +6,29 @@ and generate comprehensive, cited reports.
 """
 
 import streamlit as st
+import orjson
+import uuid
+from collections import deque
 from datetime import datetime
+from itertools import islice
+from pathlib import Path
 import time
+from tasks import forget_task, get_task, submit_research
 
-# Page config must be first Streamlit command
-st.set_page_config(
-    page_title="DeepResearch Agent",
-    page_icon="🔬",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+STATUS_REFRESH_SECONDS = 0.2  # Minimum time between status panel redraws
+MAX_STATUS_MESSAGES = 50  # Older status messages are dropped
+MAX_HISTORY = 20  # Reports kept in the sidebar history per session
+HISTORY_DIR = Path(".history")  # Past reports live on disk, not in session state
+
+_STEP_ICONS = {
+    "planning": "🧠",
+    "executing": "⚡",
+    "verifying": "✅",
+    "synthesizing": "📝"
+}
+_TYPE_EMOJI = {"web": "🌐", "arxiv": "📚", "wikipedia": "📖", "calculation": "🧮"}
 
-# Custom CSS for better styling
-st.markdown("""
+_CSS = """
 <style>
     /* Main container styling */
     .main .block-container {
@@ -83,19 +93,36 @@ st.markdown("""
         margin: 0.5rem 0;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Page config must be first Streamlit command
+st.set_page_config(
+    page_title="DeepResearch Agent",
+    page_icon="🔬",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Custom CSS for better styling. It has to be emitted on every rerun, since
+# Streamlit clears the page, but the string itself is built only once
+st.markdown(_CSS, unsafe_allow_html=True)
 
 
 def init_session_state():
     """Initialize session state variables."""
     if "research_history" not in st.session_state:
-        st.session_state.research_history = []
+        st.session_state.research_history = deque(maxlen=MAX_HISTORY)
     if "current_status" not in st.session_state:
         st.session_state.current_status = None
     if "status_messages" not in st.session_state:
-        st.session_state.status_messages = []
+        st.session_state.status_messages = deque(maxlen=MAX_STATUS_MESSAGES)
     if "is_researching" not in st.session_state:
         st.session_state.is_researching = False
+    if "task_id" not in st.session_state:
+        st.session_state.task_id = None
+    if "session_id" not in st.session_state:
+        # Keeps this browser session's semantic cache entries separate
+        st.session_state.session_id = uuid.uuid4().hex
 
 
 def render_sidebar():
@@ -128,34 +155,56 @@ def render_sidebar():
         st.markdown("---")
         st.markdown("### 📜 History")
         if st.session_state.research_history:
-            for i, item in enumerate(reversed(st.session_state.research_history[-5:])):
+            for i, item in enumerate(islice(reversed(st.session_state.research_history), 5)):
                 with st.expander(f"📄 {item['query'][:30]}..."):
                     st.caption(item['timestamp'])
                     if st.button("Load", key=f"load_{i}"):
-                        st.session_state.loaded_report = item['report']
+                        st.session_state.loaded_report = load_report(item['report_path'])
         else:
             st.caption("No research history yet")
 
 
+def save_report(report: dict) -> str:
+    """Write a report to the history directory and return its path."""
+    HISTORY_DIR.mkdir(exist_ok=True)
+    path = HISTORY_DIR / f"{uuid.uuid4().hex}.json"
+    path.write_bytes(orjson.dumps(report))
+    return str(path)
+
+
+def load_report(report_path: str):
+    """Read a report saved by save_report (None if it is gone)."""
+    try:
+        return orjson.loads(Path(report_path).read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        st.warning("This report is no longer available.")
+        return None
+
+
+def add_to_history(query: str, report: dict):
+    """Record a finished report in the session history, keeping only its path in memory."""
+    history = st.session_state.research_history
+    if len(history) == history.maxlen:
+        # The oldest entry is about to be evicted; drop its file too
+        Path(history[0]["report_path"]).unlink(missing_ok=True)
+    history.append({
+        "query": query,
+        "report_path": save_report(report),
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M")
+    })
+
+
 def render_status_panel():
     """Render the agent status panel."""
     if st.session_state.status_messages:
         st.markdown("### 📊 Agent Activity")
         
-        # Show last 5 messages
-        for msg in st.session_state.status_messages[-5:]:
-            step = msg.get("step", "")
-            message = msg.get("message", "")
-            
-            icon_map = {
-                "planning": "🧠",
-                "executing": "⚡",
-                "verifying": "✅",
-                "synthesizing": "📝"
-            }
-            icon = icon_map.get(step, "📌")
-            
-            st.markdown(f"<div class='tool-call'>{icon} {message}</div>", unsafe_allow_html=True)
+        # Show last 5 messages in a single element
+        rows = "".join(
+            f"<div class='tool-call'>{_STEP_ICONS.get(msg.get('step', ''), '📌')} {msg.get('message', '')}</div>"
+            for msg in reversed(list(islice(reversed(st.session_state.status_messages), 5)))
+        )
+        st.markdown(rows, unsafe_allow_html=True)
 
 
 def render_report(report: dict):
@@ -184,7 +233,7 @@ def render_report(report: dict):
             url = ref.get("url", "")
             source_type = ref.get("source_type", "web")
             
-            type_emoji = {"web": "🌐", "arxiv": "📚", "wikipedia": "📖", "calculation": "🧮"}.get(source_type, "📄")
+            type_emoji = _TYPE_EMOJI.get(source_type, "📄")
             
             if url:
                 st.markdown(f"[{i}] {type_emoji} [{title}]({url})")
@@ -200,20 +249,75 @@ def render_report(report: dict):
         st.caption(f"Sources: {len(references)}")
 
 
+@st.cache_data(show_spinner=False, max_entries=20)
+def report_to_markdown(report: dict) -> str:
+    """Build the Markdown export of a report (cached across reruns)."""
+    parts = [
+        f"# {report.get('title', 'Report')}",
+        f"## Executive Summary\n{report.get('executive_summary', '')}",
+    ]
+    parts.extend(
+        f"## {section.get('heading', '')}\n{section.get('content', '')}"
+        for section in report.get("sections", [])
+    )
+    return "\n\n".join(parts) + "\n"
+
+
 def run_research(query: str):
-    """Run the research workflow."""
-    from graph.workflow import ResearchWorkflow
+    """Start the research workflow in a background worker."""
+    task = submit_research(query, cache_namespace=st.session_state.session_id)
+    st.session_state.task_id = task.id
+    return task
+
+
+def stream_research(task, status_container):
+    """
+    Poll a running research task until it finishes.
     
-    # Status callback
-    def status_callback(step: str, message: str):
-        st.session_state.current_status = step
-        st.session_state.status_messages.append({"step": step, "message": message})
+    Status updates are drawn into status_container as they arrive; report
+    sections are yielded as Markdown as soon as the synthesizer drafts them.
+    """
+    last_render = 0.0
+    dirty = False
     
-    # Create and run workflow
-    workflow = ResearchWorkflow(callback=status_callback)
-    result = workflow.run(query)
+    while True:
+        done = task.wait(timeout=0.05)
+        
+        updates = task.drain()
+        if updates:
+            st.session_state.current_status = updates[-1]["step"]
+            st.session_state.status_messages.extend(updates)
+            dirty = True
+        
+        # Coalesce bursts of updates into at most one redraw per interval
+        now = time.monotonic()
+        if dirty and (done or now - last_render >= STATUS_REFRESH_SECONDS):
+            with status_container.container():
+                render_status_panel()
+            last_render = now
+            dirty = False
+        
+        for section in task.drain_sections():
+            yield f"## {section.get('heading', 'Section')}\n\n{section.get('content', '')}\n\n"
+        
+        if done:
+            break
+
+
+def await_research(task, status_container):
+    """Wait for a research task, streaming its status and draft sections, and return its result."""
+    # The draft is replaced by the full report once the task finishes
+    draft_container = st.empty()
+    with draft_container.container():
+        st.write_stream(stream_research(task, status_container))
+    draft_container.empty()
+    
+    forget_task(task.id)
+    st.session_state.task_id = None
     
-    return result
+    if task.error:
+        raise RuntimeError(task.error)
+    return task.result
 
 
 def main():
@@ -254,46 +358,39 @@ def main():
     
     st.markdown("---")
     
+    # A task started before a rerun keeps running; pick it back up
+    pending_task = get_task(st.session_state.task_id) if st.session_state.task_id else None
+    
     # Run research
-    if research_button and query:
-        st.session_state.status_messages = []
+    if (research_button and query) or pending_task:
+        if research_button and query and not pending_task:
+            st.session_state.status_messages = deque(maxlen=MAX_STATUS_MESSAGES)
         st.session_state.is_researching = True
         
         with st.spinner("🔬 Researching... This may take 1-2 minutes"):
             try:
                 # Create status container
-                status_container = st.container()
+                status_container = st.empty()
                 
-                # Run the research
-                result = run_research(query)
-                
-                # Display status messages
-                with status_container:
-                    render_status_panel()
+                # Run the research in the background and stream its status
+                task = pending_task or run_research(query)
+                query = task.query
+                result = await_research(task, status_container)
                 
                 # Check for report
                 if result.get("report"):
                     report = result["report"]
                     
                     # Save to history
-                    st.session_state.research_history.append({
-                        "query": query,
-                        "report": report,
-                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M")
-                    })
+                    add_to_history(query, report)
                     
                     # Render report
                     render_report(report)
                     
                     # Download button
-                    report_md = f"# {report.get('title', 'Report')}\n\n"
-                    report_md += f"## Executive Summary\n{report.get('executive_summary', '')}\n\n"
-                    for section in report.get("sections", []):
-                        report_md += f"## {section.get('heading', '')}\n{section.get('content', '')}\n\n"
-                    
                     st.download_button(
                         "📥 Download Report (Markdown)",
-                        report_md,
+                        report_to_markdown(report),
                         file_name=f"research_report_{datetime.now().strftime('%Y%m%d_%H%M')}.md",
                         mime="text/markdown"
                     )
@@ -1,7 +1,11 @@
 """Configuration settings for DeepResearch Agent."""
 
+import asyncio
 import os
+import re
+import threading
 import time
+from collections import deque
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -22,11 +26,158 @@ MAX_WIKI_RESULTS = 2
 # Agent Configuration
 MAX_EXECUTOR_ITERATIONS = 10
 MAX_VERIFICATION_RETRIES = 2
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "15"))  # Seconds per tool call
+EXECUTOR_CONCURRENCY = int(os.getenv("EXECUTOR_CONCURRENCY", "4"))  # Subtasks researched at once
+SUBTASK_TIMEOUT = float(os.getenv("SUBTASK_TIMEOUT", "60"))  # Seconds per subtask's tool collection
+RESEARCH_WORKERS = int(os.getenv("RESEARCH_WORKERS", "4"))  # Research queries run at once (all sessions)
 
-# Rate limiting - delay between LLM calls (seconds)
-LLM_CALL_DELAY = 0.5
+# Persistent cache for search tool results
+TOOL_CACHE_ENABLED = os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true"
+TOOL_CACHE_PATH = os.getenv("TOOL_CACHE_PATH", ".cache/tool_cache.sqlite3")
+TOOL_CACHE_TTL = 24 * 60 * 60  # Seconds
 
+# Semantic cache for Planner/Verifier/Synthesizer results
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_PATH = os.getenv("SEMANTIC_CACHE_PATH", ".cache/semantic_cache.sqlite3")
+SEMANTIC_CACHE_THRESHOLD = 0.92  # Minimum cosine similarity for a hit
+SEMANTIC_CACHE_TTL = 24 * 60 * 60  # Seconds
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 
-def rate_limit_delay():
-    """Add a small delay to avoid rate limits."""
-    time.sleep(LLM_CALL_DELAY)
+# Rate limiting - client-side estimate of the Groq account limits
+GROQ_RPM = int(os.getenv("GROQ_RPM", "30"))  # Requests per minute
+GROQ_TPM = int(os.getenv("GROQ_TPM", "6000"))  # Tokens per minute
+MAX_RATE_LIMIT_BACKOFF = 60.0  # Seconds
+
+_DURATION_RE = re.compile(r'([\d.]+)(ms|h|m|s)')
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: str) -> float:
+    """Parse a Groq reset header such as "2m59.56s" or "7.66s" into seconds."""
+    try:
+        return float(value)
+    except ValueError:
+        return sum(float(n) * _DURATION_UNITS[unit] for n, unit in _DURATION_RE.findall(value))
+
+
+class TokenBucket:
+    """
+    Sliding-window limiter that only delays LLM calls when needed.
+    
+    Tracks recent request timestamps and reported token usage; a call waits
+    only if the RPM/TPM budget for the last minute is spent, or while backing
+    off after a 429. On the happy path the delay is zero.
+    """
+    
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = deque()
+        self._tokens = deque()
+        self._backoff = 0.0
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+    
+    def _prune(self, now: float):
+        while self._requests and self._requests[0] <= now - 60:
+            self._requests.popleft()
+        while self._tokens and self._tokens[0][0] <= now - 60:
+            self._tokens.popleft()
+    
+    def reserve(self, estimated_tokens: int = 0) -> float:
+        """Reserve a request slot and return how long to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            
+            wait = max(0.0, self._blocked_until - now)
+            if len(self._requests) >= self.rpm:
+                wait = max(wait, self._requests[0] + 60 - now)
+            used = max(0, sum(tokens for _, tokens in self._tokens))
+            if self._tokens and used + estimated_tokens > self.tpm:
+                wait = max(wait, self._tokens[0][0] + 60 - now)
+            
+            self._requests.append(now + wait)
+            if estimated_tokens:
+                # Held against the budget until the call reports its real usage
+                self._tokens.append((now + wait, estimated_tokens))
+            return wait
+    
+    def record_usage(self, tokens: int, estimated_tokens: int = 0):
+        """
+        Record tokens reported by a response and reset backoff.
+        
+        Args:
+            tokens: Tokens the call actually used
+            estimated_tokens: The estimate reserved for it, which this replaces
+        """
+        with self._lock:
+            # The estimate is already counted; adjust it to the real usage,
+            # or leave it in place when the response reported none
+            delta = tokens - estimated_tokens if tokens else 0
+            if delta:
+                self._tokens.append((time.monotonic(), delta))
+            self._backoff = 0.0
+    
+    def release(self, estimated_tokens: int):
+        """Return the estimate reserved for a call that failed before using tokens."""
+        if estimated_tokens:
+            with self._lock:
+                self._tokens.append((time.monotonic(), -estimated_tokens))
+    
+    def record_rate_limit(self, retry_after: float = None):
+        """
+        Block new calls after a 429.
+        
+        Waits for the server's retry-after when given, otherwise doubles the
+        backoff from 1s, capped at MAX_RATE_LIMIT_BACKOFF either way.
+        """
+        with self._lock:
+            if retry_after is None:
+                self._backoff = min(max(self._backoff * 2, 1.0), MAX_RATE_LIMIT_BACKOFF)
+                delay = self._backoff
+            else:
+                delay = min(retry_after, MAX_RATE_LIMIT_BACKOFF)
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+    
+    def update_from_headers(self, headers):
+        """
+        Sync with the server's view of the budget from Groq response headers.
+        
+        Honors retry-after, and blocks until x-ratelimit-reset-* once the
+        matching x-ratelimit-remaining-* reaches zero.
+        """
+        delays = []
+        try:
+            if headers.get("retry-after"):
+                delays.append(parse_duration(headers["retry-after"]))
+            for kind in ("requests", "tokens"):
+                remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+                reset = headers.get(f"x-ratelimit-reset-{kind}")
+                if remaining is not None and reset and float(remaining) <= 0:
+                    delays.append(parse_duration(reset))
+        except ValueError:
+            # Malformed headers must never break the request they came with
+            return
+        
+        if delays:
+            delay = min(max(delays), MAX_RATE_LIMIT_BACKOFF)
+            with self._lock:
+                self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+
+
+RATE_LIMITER = TokenBucket(rpm=GROQ_RPM, tpm=GROQ_TPM)
+
+
+def rate_limit_delay(estimated_tokens: int = 0):
+    """Wait only as long as the rate limiter requires (usually not at all)."""
+    wait = RATE_LIMITER.reserve(estimated_tokens)
+    if wait > 0:
+        time.sleep(wait)
+
+
+async def arate_limit_delay(estimated_tokens: int = 0):
+    """Async variant of rate_limit_delay that does not block the event loop."""
+    wait = RATE_LIMITER.reserve(estimated_tokens)
+    if wait > 0:
+        await asyncio.sleep(wait)
@@ -1,19 +1,53 @@
 """LangGraph workflow connecting all agents."""
 
+import asyncio
+import hashlib
 from typing import TypedDict, Annotated, List, Dict, Any, Callable, Optional
 from langgraph.graph import StateGraph, END
+from langgraph.constants import Send
+from langchain_core.runnables import RunnableConfig
 from agents.planner import PlannerAgent
 from agents.executor import ExecutorAgent
 from agents.verifier import VerifierAgent
 from agents.synthesizer import SynthesizerAgent
-from config import MAX_VERIFICATION_RETRIES
+from llm import run_async
+from config import EXECUTOR_CONCURRENCY, MAX_VERIFICATION_RETRIES, SUBTASK_TIMEOUT
+
+
+# Next node for each step that does not fan out ("complete", "error" and unknown steps end)
+_NEXT = {
+    "verifying": "verify",
+    "synthesizing": "synthesize",
+    "complete": END,
+    "error": END,
+}
+
+_STOPWORDS = frozenset({
+    "a", "an", "and", "the", "of", "in", "on", "for", "to", "with", "about",
+    "how", "what", "is", "are", "its", "their", "research", "explain", "explore",
+})
+
+
+def subtask_key(description: str) -> str:
+    """Fingerprint a subtask description, ignoring case, spacing and stopwords."""
+    words = [w for w in description.lower().split() if w not in _STOPWORDS]
+    return hashlib.blake2b(" ".join(words).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def merge_raw_results(left: Dict[int, Any], right: Dict[int, Any]) -> Dict[int, Any]:
+    """Merge raw tool results written by parallel research nodes (keyed by subtask id)."""
+    if left is right:
+        return left
+    return {**(left or {}), **(right or {})}
 
 
 class ResearchState(TypedDict):
     """State passed between nodes in the graph."""
     query: str
     plan: Optional[Dict[str, Any]]
+    raw_results: Annotated[Dict[int, Any], merge_raw_results]
     findings: List[Dict[str, Any]]
+    findings_index: Dict[str, int]  # subtask_key -> index into findings
     verification: Optional[Dict[str, Any]]
     report: Optional[Dict[str, Any]]
     current_step: str
@@ -25,23 +59,27 @@ class ResearchState(TypedDict):
 class ResearchWorkflow:
     """LangGraph workflow for multi-agent research."""
     
-    def __init__(self, callback: Callable[[str, str], None] = None):
+    def __init__(self, callback: Callable[[str, str], None] = None, cache_namespace: str = None,
+                 section_callback: Callable[[Dict[str, Any]], None] = None):
         """
         Initialize the research workflow.
         
         Args:
             callback: Optional callback(step, message) for progress updates
+            cache_namespace: Optional semantic cache namespace (e.g. per session)
+            section_callback: Optional callback(section) for each report section as it is drafted
         """
         self.callback = callback or (lambda s, m: None)
+        self.section_callback = section_callback or (lambda section: None)
         
         # Initialize agents
-        self.planner = PlannerAgent()
+        self.planner = PlannerAgent(cache_namespace=cache_namespace)
         self.executor = ExecutorAgent()
-        self.verifier = VerifierAgent()
-        self.synthesizer = SynthesizerAgent()
+        self.verifier = VerifierAgent(cache_namespace=cache_namespace)
+        self.synthesizer = SynthesizerAgent(cache_namespace=cache_namespace)
         
-        # Build the graph
-        self.graph = self._build_graph()
+        # The topology is static, so every instance shares one compiled graph
+        self.graph = _GRAPH
     
     def _notify(self, step: str, message: str):
         """Send progress notification."""
@@ -51,7 +89,14 @@ class ResearchWorkflow:
         """Planning node - creates research plan."""
         self._notify("planning", "🧠 Creating research plan...")
         
-        result = self.planner.plan(state["query"])
+        async def plan_and_prewarm():
+            # Warm up search results for the raw query in the background while the
+            # planner thinks; the plan is returned as soon as it is ready, and the
+            # first research node collects the prewarmed results
+            self.executor.prewarm(state["query"])
+            return await self.planner.plan_async(state["query"])
+        
+        result = run_async(plan_and_prewarm())
         
         if result["success"]:
             state["plan"] = result["plan"]
@@ -65,20 +110,43 @@ class ResearchWorkflow:
         
         return state
     
-    def _execute_node(self, state: ResearchState) -> ResearchState:
-        """Execution node - runs research using tools."""
-        self._notify("executing", "⚡ Executing research plan...")
+    def _research_node(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """Research node - collects tool results for one subtask (run in parallel via Send)."""
+        subtask = task["subtask"]
+        self._notify("executing", f"Executing subtask {task['index']+1}/{task['total']}: {subtask.get('description', '')[:50]}...")
         
-        def progress_callback(msg):
-            self._notify("executing", msg)
+        try:
+            raw = run_async(asyncio.wait_for(
+                self.executor.acollect_subtask(subtask, also_search=task.get("prewarm")),
+                SUBTASK_TIMEOUT,
+            ))
+        except asyncio.TimeoutError:
+            self._notify("executing", f"⚠️ Subtask {task['index']+1} timed out after {SUBTASK_TIMEOUT:.0f}s")
+            raw = {"results": [], "sources": [], "errors": [f"Subtask {task['index']+1} timed out"]}
+        
+        return {"raw_results": {subtask.get("id", 1): raw}}
+    
+    def _summarize_node(self, state: ResearchState) -> ResearchState:
+        """Fan-in node - summarizes all collected tool results in one LLM call."""
+        subtasks = self._pending_subtasks(state)
+        if subtasks:
+            self._notify("executing", f"Summarizing findings for {len(subtasks)} subtasks...")
+            findings = run_async(self.executor.asynthesize_all(subtasks, state["raw_results"]))
+        else:
+            findings = []
         
-        findings = self.executor.execute_plan(state["plan"], callback=progress_callback)
+        # Parallel branches cannot share the errors list, so their tool errors are collected here
+        for subtask in subtasks:
+            raw = state["raw_results"].get(subtask.get("id", 1), {})
+            state["errors"].extend(raw.get("errors", []))
         
-        state["findings"].extend(findings)
+        for subtask, finding in zip(subtasks, findings):
+            state["findings_index"][subtask_key(subtask.get("description", ""))] = len(state["findings"])
+            state["findings"].append(finding)
         state["current_step"] = "verifying"
         state["messages"].append(f"✅ Gathered {len(findings)} findings")
         
-        total_sources = sum(len(f.get("sources", [])) for f in findings)
+        total_sources = sum(len(f.get("sources", [])) for f in state["findings"])
         self._notify("executing", f"✅ Research complete: {total_sources} sources collected")
         
         return state
@@ -87,11 +155,11 @@ class ResearchWorkflow:
         """Verification node - reviews findings."""
         self._notify("verifying", "✅ Verifying research quality...")
         
-        result = self.verifier.verify(
+        result = run_async(self.verifier.verify_async(
             state["query"],
             state["plan"],
             state["findings"]
-        )
+        ))
         
         verification = result["verification"]
         state["verification"] = verification
@@ -102,13 +170,18 @@ class ResearchWorkflow:
             self._notify("verifying", f"✅ Verified with {verification['confidence_score']:.0%} confidence")
         else:
             state["iteration"] += 1
-            if state["iteration"] < MAX_VERIFICATION_RETRIES:
+            if state["iteration"] >= MAX_VERIFICATION_RETRIES:
+                state["current_step"] = "synthesizing"
+                state["messages"].append("⚠️ Max iterations reached, proceeding anyway")
+                self._notify("verifying", "⚠️ Proceeding with available findings")
+            elif self._add_follow_up_subtasks(state, verification.get("missing_aspects", [])):
                 state["current_step"] = "executing"
-                state["messages"].append(f"🔄 Need more research: {', '.join(verification.get('missing_aspects', []))}")
+                state["messages"].append(f"🔄 Need more research: {', '.join(map(str, verification.get('missing_aspects', [])))}")
                 self._notify("verifying", "🔄 Requesting additional research...")
             else:
+                # Researching the same plan again would only reproduce the same findings
                 state["current_step"] = "synthesizing"
-                state["messages"].append("⚠️ Max iterations reached, proceeding anyway")
+                state["messages"].append("⚠️ No new aspects to research, proceeding anyway")
                 self._notify("verifying", "⚠️ Proceeding with available findings")
         
         return state
@@ -117,10 +190,15 @@ class ResearchWorkflow:
         """Synthesis node - creates final report."""
         self._notify("synthesizing", "📝 Writing research report...")
         
+        def section_callback(section):
+            self._notify("synthesizing", f"✍️ Drafted section: {section.get('heading', 'Section')}")
+            self.section_callback(section)
+        
         result = self.synthesizer.synthesize(
             state["query"],
             state["plan"],
-            state["findings"]
+            state["findings"],
+            callback=section_callback
         )
         
         if result["success"]:
@@ -134,68 +212,76 @@ class ResearchWorkflow:
         
         return state
     
-    def _should_continue(self, state: ResearchState) -> str:
+    def _should_continue(self, state: ResearchState):
         """Determine next node based on current step."""
         step = state["current_step"]
         
+        # Executing fans out dynamically; every other step maps to a fixed node
         if step == "executing":
-            return "execute"
-        elif step == "verifying":
-            return "verify"
-        elif step == "synthesizing":
-            return "synthesize"
-        elif step == "complete":
-            return END
-        elif step == "error":
-            return END
-        else:
-            return END
-    
-    def _build_graph(self) -> StateGraph:
-        """Build the LangGraph workflow."""
-        workflow = StateGraph(ResearchState)
-        
-        # Add nodes
-        workflow.add_node("plan", self._plan_node)
-        workflow.add_node("execute", self._execute_node)
-        workflow.add_node("verify", self._verify_node)
-        workflow.add_node("synthesize", self._synthesize_node)
-        
-        # Set entry point
-        workflow.set_entry_point("plan")
-        
-        # Add edges
-        workflow.add_conditional_edges(
-            "plan",
-            self._should_continue,
-            {
-                "execute": "execute",
-                END: END
-            }
-        )
+            return self._dispatch_research(state)
+        return _NEXT.get(step, END)
+    
+    def _pending_subtasks(self, state: ResearchState) -> List[Dict[str, Any]]:
+        """Plan subtasks that have no findings yet, with duplicate descriptions dropped."""
+        pending = {}
+        for subtask in state["plan"].get("subtasks", []):
+            key = subtask_key(subtask.get("description", ""))
+            if key not in state["findings_index"]:
+                pending.setdefault(key, subtask)
+        return list(pending.values())
+    
+    def _add_follow_up_subtasks(self, state: ResearchState, missing_aspects: List[str]) -> int:
+        """
+        Re-plan after a rejected verification: add a subtask per missing aspect.
         
-        workflow.add_conditional_edges(
-            "execute",
-            self._should_continue,
-            {
-                "verify": "verify",
-                END: END
-            }
-        )
+        Aspects matching a subtask that is already researched or planned are
+        skipped, so only genuinely new research is dispatched.
         
-        workflow.add_conditional_edges(
-            "verify",
-            self._should_continue,
-            {
-                "execute": "execute",  # Loop back for more research
-                "synthesize": "synthesize",
-                END: END
-            }
-        )
+        Returns:
+            Number of subtasks added to the plan
+        """
+        subtasks = list(state["plan"].get("subtasks", []))
+        known = set(state["findings_index"])
+        known.update(subtask_key(s.get("description", "")) for s in subtasks)
+        next_id = max((s.get("id", 0) for s in subtasks), default=0) + 1
+        
+        added = 0
+        for aspect in missing_aspects:
+            # The verifier's JSON is model output, so aspects may not be strings
+            if not isinstance(aspect, str) or not aspect.strip():
+                continue
+            key = subtask_key(aspect)
+            if key in known:
+                continue
+            known.add(key)
+            subtasks.append({
+                "id": next_id + added,
+                "description": aspect,
+                "tools_needed": ["tavily", "wikipedia"],
+                "priority": "high",
+            })
+            added += 1
         
-        workflow.add_edge("synthesize", END)
+        state["plan"] = {**state["plan"], "subtasks": subtasks}
+        return added
+    
+    def _dispatch_research(self, state: ResearchState):
+        """Fan out one research node per new subtask; they fan back in at summarize."""
+        self._notify("executing", "⚡ Executing research plan...")
+        subtasks = self._pending_subtasks(state)
         
-        return workflow.compile()
+        reused = len(state["findings_index"])
+        if reused:
+            self._notify("executing", f"♻️ Reusing findings for {reused} already researched subtasks")
+        if not subtasks:
+            return "summarize"
+        # The first subtask of the first round picks up the searches prewarmed during planning
+        prewarm = None if reused else state["query"]
+        return [
+            Send("research", {"subtask": subtask, "index": i, "total": len(subtasks),
+                              "prewarm": prewarm if i == 0 else None})
+            for i, subtask in enumerate(subtasks)
+        ]
     
     def run(self, query: str) -> Dict[str, Any]:
         """
@@ -210,7 +296,9 @@ class ResearchWorkflow:
         initial_state: ResearchState = {
             "query": query,
             "plan": None,
+            "raw_results": {},
             "findings": [],
+            "findings_index": {},
             "verification": None,
             "report": None,
             "current_step": "planning",
@@ -219,6 +307,71 @@ class ResearchWorkflow:
             "errors": []
         }
         
-        final_state = self.graph.invoke(initial_state)
+        # max_concurrency caps how many research branches run at once
+        final_state = self.graph.invoke(initial_state, config={
+            "max_concurrency": EXECUTOR_CONCURRENCY,
+            "configurable": {"workflow": self},
+        })
         
         return final_state
+
+
+def _node(method: str) -> Callable:
+    """Graph callable that forwards to a method of the ResearchWorkflow running it."""
+    def node(state, config: RunnableConfig):
+        return getattr(config["configurable"]["workflow"], method)(state)
+    node.__name__ = method.strip("_")
+    return node
+
+
+def _build_graph() -> StateGraph:
+    """Build the LangGraph workflow (compiled once; nodes resolve the workflow from config)."""
+    workflow = StateGraph(ResearchState)
+    
+    # Add nodes
+    workflow.add_node("plan", _node("_plan_node"))
+    workflow.add_node("research", _node("_research_node"))
+    workflow.add_node("summarize", _node("_summarize_node"))
+    workflow.add_node("verify", _node("_verify_node"))
+    workflow.add_node("synthesize", _node("_synthesize_node"))
+    
+    # Set entry point
+    workflow.set_entry_point("plan")
+    
+    # Add edges
+    workflow.add_conditional_edges(
+        "plan",
+        _node("_should_continue"),
+        {
+            "summarize": "summarize",
+            END: END
+        }
+    )
+    
+    # Every parallel research branch joins here before summarizing
+    workflow.add_edge("research", "summarize")
+    
+    workflow.add_conditional_edges(
+        "summarize",
+        _node("_should_continue"),
+        {
+            "verify": "verify",
+            END: END
+        }
+    )
+    
+    workflow.add_conditional_edges(
+        "verify",
+        _node("_should_continue"),
+        {
+            "synthesize": "synthesize",
+            END: END
+        }
+    )
+    
+    workflow.add_edge("synthesize", END)
+    
+    return workflow.compile()
+
+
+_GRAPH = _build_graph()
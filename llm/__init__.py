@@ -1,29 +1,184 @@
 """LLM Configuration and Utilities for DeepResearch Agent."""
 
-from langchain_groq import ChatGroq
-from config import GROQ_API_KEY, MODEL_NAME, TEMPERATURE
+import asyncio
+import threading
+from functools import lru_cache
+from typing import Any, Awaitable, Dict, TypeVar
+from config import (
+    GROQ_API_KEY, MODEL_NAME, TEMPERATURE, RATE_LIMITER,
+    arate_limit_delay, parse_duration, rate_limit_delay,
+)
 
+T = TypeVar("T")
 
-def get_llm(temperature: float = None, max_tokens: int = None):
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """Start (once) the event loop that owns all async LLM and tool I/O."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-loop", daemon=True).start()
+    return _loop
+
+
+def run_async(coro: Awaitable[T]) -> T:
+    """
+    Run a coroutine from sync code and block until it finishes.
+    
+    Unlike asyncio.run(), every call shares one long-lived loop, so the
+    pooled async HTTP connections stay valid between calls. Must not be
+    called from a coroutine running on that loop.
     """
-    Get a configured LLM instance.
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop()).result()
+
+
+@lru_cache(maxsize=1)
+def _http_clients():
+    """
+    Shared keep-alive HTTP clients (sync, async) for all LLM instances.
+    
+    Every response's rate-limit headers are fed to the rate limiter, so it
+    tracks Groq's actual remaining budget rather than only its own estimate.
+    """
+    import httpx
+    
+    def track_limits(response):
+        RATE_LIMITER.update_from_headers(response.headers)
+    
+    async def atrack_limits(response):
+        RATE_LIMITER.update_from_headers(response.headers)
+    
+    limits = httpx.Limits(max_connections=32, max_keepalive_connections=16)
+    timeout = httpx.Timeout(60.0, connect=5.0)
+    return (
+        httpx.Client(limits=limits, timeout=timeout, event_hooks={"response": [track_limits]}),
+        httpx.AsyncClient(limits=limits, timeout=timeout, event_hooks={"response": [atrack_limits]}),
+    )
+
+
+@lru_cache(maxsize=8)
+def get_llm(temperature: float = None, max_tokens: int = None, model_name: str = None,
+            json_mode: bool = False):
+    """
+    Get a shared, configured LLM instance.
+    
+    Instances are memoized per argument tuple, and all of them share one
+    sync and one async HTTP connection pool, so calls reuse TLS sessions.
     
     Args:
         temperature: Override default temperature
         max_tokens: Maximum tokens for response
+        model_name: Override default model
+        json_mode: Ask Groq to guarantee a JSON object response
         
     Returns:
         Configured ChatGroq instance
     """
+    from langchain_groq import ChatGroq
+    
+    http_client, http_async_client = _http_clients()
     return ChatGroq(
         api_key=GROQ_API_KEY,
-        model_name=MODEL_NAME,
-        temperature=temperature or TEMPERATURE,
+        model_name=model_name or MODEL_NAME,
+        temperature=TEMPERATURE if temperature is None else temperature,
         max_tokens=max_tokens,
         max_retries=3,
+        model_kwargs={"response_format": {"type": "json_object"}} if json_mode else {},
+        http_client=http_client,
+        http_async_client=http_async_client,
     )
 
 
+def _is_rate_limit_error(error: Exception) -> bool:
+    """Whether an exception is a Groq 429 response."""
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+
+def _retry_after(error: Exception):
+    """Seconds from a 429's retry-after header, or None if absent."""
+    response = getattr(error, "response", None)
+    value = getattr(response, "headers", {}).get("retry-after")
+    try:
+        return parse_duration(value) if value else None
+    except ValueError:
+        return None
+
+
+def _total_tokens(response) -> int:
+    """Total tokens reported on an LLM response message, if any."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    if usage.get("total_tokens"):
+        return usage["total_tokens"]
+    metadata = getattr(response, "response_metadata", None) or {}
+    return metadata.get("token_usage", {}).get("total_tokens", 0)
+
+
+def estimate_tokens(chain, inputs: Dict[str, Any]) -> int:
+    """
+    Rough token cost of a call, reserved with the rate limiter up front.
+    
+    About 4 characters per prompt token, plus the model's max_tokens
+    budget for the completion.
+    """
+    try:
+        prompt = chain.first.invoke(inputs).to_string()
+    except Exception:
+        prompt = "".join(str(value) for value in inputs.values())
+    max_tokens = getattr(getattr(chain, "last", None), "max_tokens", None) or 0
+    return len(prompt) // 4 + max_tokens
+
+
+def invoke_llm(chain, inputs: Dict[str, Any]):
+    """Invoke a chain behind the rate limiter, feeding usage and 429s back into it."""
+    estimated = estimate_tokens(chain, inputs)
+    rate_limit_delay(estimated)
+    try:
+        response = chain.invoke(inputs)
+    except Exception as e:
+        RATE_LIMITER.release(estimated)
+        if _is_rate_limit_error(e):
+            RATE_LIMITER.record_rate_limit(_retry_after(e))
+        raise
+    RATE_LIMITER.record_usage(_total_tokens(response), estimated)
+    return response
+
+
+async def ainvoke_llm(chain, inputs: Dict[str, Any]):
+    """Async variant of invoke_llm."""
+    estimated = estimate_tokens(chain, inputs)
+    await arate_limit_delay(estimated)
+    try:
+        response = await chain.ainvoke(inputs)
+    except Exception as e:
+        RATE_LIMITER.release(estimated)
+        if _is_rate_limit_error(e):
+            RATE_LIMITER.record_rate_limit(_retry_after(e))
+        raise
+    RATE_LIMITER.record_usage(_total_tokens(response), estimated)
+    return response
+
+
+def stream_llm(chain, inputs: Dict[str, Any]):
+    """Stream a chain behind the rate limiter, yielding message chunks."""
+    estimated = estimate_tokens(chain, inputs)
+    rate_limit_delay(estimated)
+    tokens = 0
+    try:
+        for chunk in chain.stream(inputs):
+            tokens += _total_tokens(chunk)
+            yield chunk
+    except Exception as e:
+        RATE_LIMITER.release(estimated - tokens)
+        if _is_rate_limit_error(e):
+            RATE_LIMITER.record_rate_limit(_retry_after(e))
+        raise
+    RATE_LIMITER.record_usage(tokens, estimated)
+
+
 # Available models on Groq
 AVAILABLE_MODELS = [
     "llama-3.1-8b-instant",      # Fast, good for simple tasks
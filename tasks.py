@@ -0,0 +1,107 @@
+"""Background research tasks.
+
+Runs ResearchWorkflow on a worker pool instead of the Streamlit script
+thread. Progress updates and drafted report sections are pushed onto
+per-task queues that the UI polls, and the task outlives reruns of the
+script that started it.
+"""
+
+import queue
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from config import RESEARCH_WORKERS
+
+_POOL = ThreadPoolExecutor(max_workers=RESEARCH_WORKERS, thread_name_prefix="research")
+_TASKS: Dict[str, "ResearchTask"] = {}
+_TASKS_LOCK = threading.Lock()
+
+
+def _drain(q: queue.Queue) -> list:
+    """Pop everything currently in a queue without blocking."""
+    items = []
+    while True:
+        try:
+            items.append(q.get_nowait())
+        except queue.Empty:
+            return items
+
+
+class ResearchTask:
+    """A research query running in the background."""
+
+    def __init__(self, query: str):
+        self.id = uuid.uuid4().hex
+        self.query = query
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._updates: queue.Queue = queue.Queue()
+        self._sections: queue.Queue = queue.Queue()
+        self._done = threading.Event()
+
+    def notify(self, step: str, message: str):
+        """Workflow callback: queue a status update for the UI."""
+        self._updates.put({"step": step, "message": message})
+
+    def notify_section(self, section: Dict[str, Any]):
+        """Workflow callback: queue a drafted report section for the UI."""
+        self._sections.put(section)
+
+    def drain(self) -> List[Dict[str, str]]:
+        """Return all status updates queued since the last call."""
+        return _drain(self._updates)
+
+    def drain_sections(self) -> List[Dict[str, Any]]:
+        """Return all drafted sections queued since the last call."""
+        return _drain(self._sections)
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block up to timeout seconds; True once the task has finished."""
+        return self._done.wait(timeout)
+
+    def _run(self, cache_namespace: str = None):
+        from graph.workflow import ResearchWorkflow
+
+        try:
+            workflow = ResearchWorkflow(
+                callback=self.notify,
+                cache_namespace=cache_namespace,
+                section_callback=self.notify_section,
+            )
+            self.result = workflow.run(self.query)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self._done.set()
+
+
+def submit_research(query: str, cache_namespace: str = None) -> ResearchTask:
+    """
+    Start a research query on the worker pool.
+
+    Args:
+        query: User's research query
+        cache_namespace: Optional semantic cache namespace (e.g. per session)
+
+    Returns:
+        The running task; look it up again later with get_task(task.id)
+    """
+    task = ResearchTask(query)
+    with _TASKS_LOCK:
+        _TASKS[task.id] = task
+    _POOL.submit(task._run, cache_namespace)
+    return task
+
+
+def get_task(task_id: str) -> Optional[ResearchTask]:
+    """Return a submitted task by id, or None if unknown."""
+    with _TASKS_LOCK:
+        return _TASKS.get(task_id)
+
+
+def forget_task(task_id: str):
+    """Drop a finished task once its result has been consumed."""
+    with _TASKS_LOCK:
+        _TASKS.pop(task_id, None)
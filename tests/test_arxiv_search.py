@@ -0,0 +1,82 @@
+"""Offline tests for the arXiv search tool."""
+
+import importlib
+import unittest
+from unittest import mock
+
+import httpx
+
+from tools import _cache
+from tools._cache import ToolCache
+
+# tools/__init__.py re-exports the function under the module's name
+arxiv_module = importlib.import_module("tools.arxiv_search")
+
+FEED = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry>
+    <id>http://arxiv.org/abs/2005.11401v4</id>
+    <published>2020-05-22T17:51:30Z</published>
+    <title>Retrieval-Augmented
+      Generation</title>
+    <summary>{summary}</summary>
+    <author><name>A</name></author>
+    <author><name>B</name></author>
+    <author><name>C</name></author>
+    <author><name>D</name></author>
+    <link href="http://arxiv.org/abs/2005.11401v4" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/2005.11401v4" rel="related" type="application/pdf"/>
+  </entry>
+</feed>"""
+
+
+class ParseFeedTest(unittest.TestCase):
+
+    def test_fields(self):
+        (paper,) = arxiv_module._parse_feed(FEED.format(summary="Short abstract."))
+        self.assertEqual(paper["title"], "Retrieval-Augmented Generation")
+        self.assertEqual(paper["authors"], "A, B, C et al.")
+        self.assertEqual(paper["abstract"], "Short abstract.")
+        self.assertEqual(paper["url"], "http://arxiv.org/abs/2005.11401v4")
+        self.assertEqual(paper["pdf_url"], "http://arxiv.org/pdf/2005.11401v4")
+        self.assertEqual(paper["published"], "2020-05-22")
+        self.assertEqual(paper["source_type"], "arxiv")
+
+    def test_long_abstract_is_marked_as_cut(self):
+        (paper,) = arxiv_module._parse_feed(FEED.format(summary="x" * 700))
+        self.assertEqual(paper["abstract"], "x" * 600 + "...")
+
+
+class ArxivSearchTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(_cache, "get_tool_cache", return_value=ToolCache(enabled=False))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_uses_shared_client(self):
+        client = mock.Mock()
+        client.get.return_value = httpx.Response(
+            200, text=FEED.format(summary="Abstract."), request=httpx.Request("GET", arxiv_module.ARXIV_API_URL))
+        with mock.patch.object(arxiv_module, "_client", return_value=client):
+            results = arxiv_module.arxiv_search("rag", max_results=2)
+
+        self.assertEqual([r["title"] for r in results], ["Retrieval-Augmented Generation"])
+        params = client.get.call_args.kwargs["params"]
+        self.assertEqual((params["search_query"], params["max_results"]), ("rag", 2))
+
+    def test_http_errors_become_error_results(self):
+        client = mock.Mock()
+        client.get.return_value = httpx.Response(503, request=httpx.Request("GET", arxiv_module.ARXIV_API_URL))
+        with mock.patch.object(arxiv_module, "_client", return_value=client):
+            results = arxiv_module.arxiv_search("rag")
+
+        self.assertEqual(len(results), 1)
+        self.assertIn("ArXiv search failed", results[0]["error"])
+
+    def test_client_is_shared(self):
+        self.assertIs(arxiv_module._client(), arxiv_module._client())
+
+
+if __name__ == "__main__":
+    unittest.main()
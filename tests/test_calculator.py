@@ -0,0 +1,41 @@
+"""Offline tests for the calculator's AST whitelist."""
+
+import unittest
+
+from tools.calculator import calculator
+
+
+class CalculatorTest(unittest.TestCase):
+
+    def test_arithmetic_and_math_functions(self):
+        self.assertEqual(calculator("2 + 3 * 4")["result"], 14)
+        self.assertEqual(calculator("sqrt(16) + pow(2, 3)")["result"], 12.0)
+        self.assertEqual(calculator(" 42 ")["result"], 42)
+
+    def test_division_by_zero(self):
+        self.assertEqual(calculator("1 / 0"), {"error": "Division by zero"})
+
+    def test_rejects_dunder_escape(self):
+        self.assertIn("forbidden syntax", calculator("().__class__")["error"])
+        self.assertIn("error", calculator("().__class__.__bases__[0].__subclasses__()"))
+
+    def test_rejects_string_constants(self):
+        self.assertIn("numeric constants", calculator("'a' * 3")["error"])
+        self.assertIn("error", calculator("'abc'"))
+
+    def test_rejects_bools(self):
+        self.assertIn("numeric constants", calculator("True")["error"])
+        self.assertIn("numeric constants", calculator("False + 1")["error"])
+
+    def test_rejects_attribute_calls(self):
+        self.assertIn("Only calls to math functions", calculator("sqrt.__call__(4)")["error"])
+        self.assertIn("error", calculator("(1).bit_length()"))
+
+    def test_rejects_unknown_names_and_other_syntax(self):
+        self.assertIn("Unknown name", calculator("open(0)")["error"])
+        self.assertIn("error", calculator("[x for x in (1, 2)]"))
+        self.assertIn("error", calculator("lambda: 1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
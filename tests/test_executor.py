@@ -0,0 +1,127 @@
+"""Offline tests for the executor's in-flight tool call cache."""
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest import mock
+
+from agents import executor
+from agents.executor import ExecutorAgent
+
+
+class CountingTool:
+    """Fake tool that records its calls and returns canned results in order."""
+
+    def __init__(self, *results, delay=0.0):
+        self.results = list(results)
+        self.delay = delay
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, query):
+        with self.lock:
+            self.calls += 1
+            result = self.results[min(self.calls, len(self.results)) - 1]
+        time.sleep(self.delay)
+        return result
+
+
+class ToolCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        with mock.patch.object(executor, "get_llm"):
+            self.agent = ExecutorAgent()
+
+    def test_concurrent_identical_calls_share_one_round_trip(self):
+        tool = self.agent.tools["tavily"] = CountingTool({"results": [1]}, delay=0.05)
+
+        async def run():
+            return await asyncio.gather(
+                self.agent._acall_tool("tavily", "What is RAG?"),
+                self.agent._acall_tool("tavily", "what  is rag?"),
+            )
+
+        first, second = asyncio.run(run())
+        self.assertEqual(tool.calls, 1)
+        self.assertEqual(first, {"results": [1]})
+        self.assertEqual(second, {"results": [1]})
+        # Each caller gets its own copy
+        first["results"].append(2)
+        self.assertEqual(second, {"results": [1]})
+
+    def test_prewarm_is_joined_by_later_call(self):
+        tool = self.agent.tools["tavily"] = CountingTool({"results": []}, delay=0.05)
+        self.agent.tools["wikipedia"] = CountingTool([])
+
+        async def run():
+            self.agent.prewarm("RAG")
+            return await self.agent._acall_tool("tavily", "rag")
+
+        self.assertEqual(asyncio.run(run()), {"results": []})
+        self.assertEqual(tool.calls, 1)
+
+    def test_errors_are_forgotten_and_retried(self):
+        tool = self.agent.tools["tavily"] = CountingTool({"error": "boom"}, {"results": [1]})
+
+        async def run():
+            first = await self.agent._acall_tool("tavily", "rag")
+            second = await self.agent._acall_tool("tavily", "rag")
+            third = await self.agent._acall_tool("tavily", "rag")
+            return first, second, third
+
+        first, second, third = asyncio.run(run())
+        self.assertEqual(first, {"error": "boom"})
+        self.assertEqual(second, {"results": [1]})
+        self.assertEqual(third, {"results": [1]})
+        self.assertEqual(tool.calls, 2)
+
+    def test_exceptions_and_timeouts_become_errors(self):
+        def broken(query):
+            raise RuntimeError("down")
+
+        self.agent.tools["arxiv"] = broken
+        self.agent.tools["wikipedia"] = CountingTool([], delay=0.5)
+
+        async def run():
+            with mock.patch.object(executor, "TOOL_TIMEOUT", 0.05):
+                return await asyncio.gather(
+                    self.agent._acall_tool("arxiv", "rag"),
+                    self.agent._acall_tool("wikipedia", "rag"),
+                )
+
+        failed, timed_out = asyncio.run(run())
+        self.assertEqual(failed, {"error": "arxiv failed: down"})
+        self.assertIn("timed out", timed_out["error"])
+
+    def test_collect_subtask_includes_prewarmed_results(self):
+        tavily = self.agent.tools["tavily"] = CountingTool(
+            [{"title": "T", "url": "https://t", "content": "tavily body"}], delay=0.05)
+        wikipedia = self.agent.tools["wikipedia"] = CountingTool(
+            [{"title": "W", "url": "https://w", "summary": "wiki body"}])
+        subtask = {"id": 1, "description": "RAG basics", "tools_needed": ["tavily"]}
+
+        async def run():
+            self.agent.prewarm("What is RAG?")
+            return await self.agent.acollect_subtask(subtask, also_search="what is rag?")
+
+        raw = asyncio.run(run())
+        # One call for the subtask, one joined from the prewarm
+        self.assertEqual(tavily.calls, 2)
+        self.assertEqual(wikipedia.calls, 1)
+        self.assertEqual([s["url"] for s in raw["sources"]], ["https://t", "https://t", "https://w"])
+        self.assertEqual(raw["errors"], [])
+
+    def test_cache_is_bounded(self):
+        self.agent.tools["tavily"] = CountingTool({"results": []})
+
+        async def run():
+            for i in range(executor.TOOL_MEMO_SIZE + 10):
+                await self.agent._acall_tool("tavily", f"query {i}")
+
+        asyncio.run(run())
+        self.assertEqual(len(self.agent._tool_cache), executor.TOOL_MEMO_SIZE)
+
+
+if __name__ == "__main__":
+    unittest.main()
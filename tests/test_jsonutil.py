@@ -0,0 +1,67 @@
+"""Offline tests for the JSON helpers used to parse LLM responses."""
+
+import unittest
+
+from agents._jsonutil import SectionStreamParser, extract_json, find_json_object, parse_json_response
+
+
+class FindJsonObjectTest(unittest.TestCase):
+
+    def test_ignores_braces_inside_strings(self):
+        text = 'Here you go: {"a": "x}y{", "b": {"c": "\\"}"}} trailing }'
+        self.assertEqual(find_json_object(text), '{"a": "x}y{", "b": {"c": "\\"}"}}')
+
+    def test_unbalanced_object(self):
+        self.assertIsNone(find_json_object('{"a": 1'))
+        self.assertIsNone(find_json_object("no json here"))
+
+
+class ExtractJsonTest(unittest.TestCase):
+
+    def test_code_fence(self):
+        self.assertEqual(extract_json('```json\n{"a": [1, 2]}\n```'), {"a": [1, 2]})
+
+    def test_prose_around_object(self):
+        self.assertEqual(extract_json('Sure! {"a": "{b}"} Hope that helps.'), {"a": "{b}"})
+
+    def test_raw_control_characters(self):
+        self.assertEqual(extract_json('{"a": "line1\nline2\ttab"}'), {"a": "line1\nline2\ttab"})
+
+    def test_parse_json_response_fast_path(self):
+        self.assertEqual(parse_json_response('{"subtasks": []}'), {"subtasks": []})
+
+
+class SectionStreamParserTest(unittest.TestCase):
+
+    REPORT = (
+        '{"title": "T {draft}", "sections": ['
+        '{"heading": "One", "content": "a } tricky { \\"quote\\""}, '
+        '{"heading": "Two", "content": "[b]"}'
+        ']}'
+    )
+
+    def feed_in_chunks(self, text, size):
+        parser = SectionStreamParser()
+        sections = []
+        for i in range(0, len(text), size):
+            sections.extend(parser.feed(text[i:i + size]))
+        return sections
+
+    def test_sections_split_across_chunks(self):
+        expected = [
+            {"heading": "One", "content": 'a } tricky { "quote"'},
+            {"heading": "Two", "content": "[b]"},
+        ]
+        for size in (1, 3, 7, len(self.REPORT)):
+            with self.subTest(chunk_size=size):
+                self.assertEqual(self.feed_in_chunks(self.REPORT, size), expected)
+
+    def test_ignores_preamble(self):
+        self.assertEqual(len(self.feed_in_chunks("Sure! " + self.REPORT, 5)), 2)
+
+    def test_incomplete_section_is_not_emitted(self):
+        self.assertEqual(self.feed_in_chunks('{"sections": [{"heading": "One", "cont', 4), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+"""Offline tests for the sandboxed python_executor tool."""
+
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from tools.python_executor import python_executor
+
+
+class PythonExecutorTest(unittest.TestCase):
+
+    def test_captures_output(self):
+        result = python_executor("print(sum(range(10)))")
+        self.assertEqual(result["output"], "45\n")
+        self.assertIsNone(result["errors"])
+
+    def test_captures_library_output(self):
+        # re.DEBUG prints the compiled pattern without any print() in the snippet
+        result = python_executor("x = re.match('a+b', 'ab', re.DEBUG)")
+        self.assertIn("LITERAL", result["output"])
+
+    def test_rejects_forbidden_operations(self):
+        self.assertIn("open(", python_executor("open('/etc/passwd')")["error"])
+        self.assertIn("__import__", python_executor("__import__('os')")["error"])
+
+    def test_reports_errors(self):
+        self.assertIn("division by zero", python_executor("1 / 0")["error"])
+        self.assertIn("Execution failed", python_executor("x = (")["error"])
+
+    def test_snippets_do_not_share_state(self):
+        python_executor("__builtins__['len'] = None\nmath.answer = 42")
+        self.assertEqual(python_executor("print(len([1, 2]))")["output"], "2\n")
+
+    def test_timeout_stops_runaway_code(self):
+        start = time.monotonic()
+        result = python_executor("while True:\n    pass", timeout=1)
+        self.assertEqual(result, {"error": "Execution timed out after 1s"})
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_timeout_cannot_be_caught(self):
+        code = (
+            "while True:\n"
+            "    try:\n"
+            "        while True:\n"
+            "            pass\n"
+            "    except BaseException:\n"
+            "        pass\n"
+        )
+        self.assertIn("timed out", python_executor(code, timeout=1)["error"])
+
+    def test_timeout_on_worker_thread(self):
+        # Tools run on the executor's thread pool, not the main thread
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            result = pool.submit(python_executor, "while True: pass", 1).result(timeout=10)
+        self.assertIn("timed out", result["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()
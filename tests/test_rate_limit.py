@@ -0,0 +1,96 @@
+"""Offline tests for the Groq rate limiter."""
+
+import unittest
+
+from config import MAX_RATE_LIMIT_BACKOFF, TokenBucket, parse_duration
+
+
+class ParseDurationTest(unittest.TestCase):
+
+    def test_groq_reset_formats(self):
+        self.assertAlmostEqual(parse_duration("2m59.56s"), 179.56)
+        self.assertAlmostEqual(parse_duration("100ms"), 0.1)
+        self.assertAlmostEqual(parse_duration("7.66s"), 7.66)
+        self.assertAlmostEqual(parse_duration("1h2m3s"), 3723.0)
+        self.assertAlmostEqual(parse_duration("1m200ms"), 60.2)
+
+    def test_plain_seconds(self):
+        self.assertEqual(parse_duration("12"), 12.0)
+        self.assertEqual(parse_duration("0.5"), 0.5)
+
+
+class TokenBucketTest(unittest.TestCase):
+
+    def test_no_wait_within_budget(self):
+        bucket = TokenBucket(rpm=2, tpm=1000)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertGreater(bucket.reserve(), 59.0)
+
+    def test_estimates_are_reserved_before_usage_is_known(self):
+        bucket = TokenBucket(rpm=100, tpm=6000)
+        self.assertEqual(bucket.reserve(4000), 0.0)
+        # The first call's estimate still counts, so a second large call waits
+        self.assertGreater(bucket.reserve(4000), 59.0)
+
+    def test_usage_replaces_estimate(self):
+        bucket = TokenBucket(rpm=100, tpm=6000)
+        bucket.reserve(4000)
+        bucket.record_usage(500, 4000)
+        self.assertEqual(bucket.reserve(4000), 0.0)
+
+    def test_failed_call_releases_estimate(self):
+        bucket = TokenBucket(rpm=100, tpm=6000)
+        bucket.reserve(4000)
+        bucket.release(4000)
+        self.assertEqual(bucket.reserve(4000), 0.0)
+
+    def test_retry_after_blocks(self):
+        bucket = TokenBucket(rpm=100, tpm=100000)
+        bucket.record_rate_limit(retry_after=5)
+        self.assertAlmostEqual(bucket.reserve(), 5.0, places=1)
+
+    def test_backoff_doubles_without_retry_after(self):
+        bucket = TokenBucket(rpm=100, tpm=100000)
+        bucket.record_rate_limit()
+        bucket.record_rate_limit()
+        self.assertAlmostEqual(bucket.reserve(), 2.0, places=1)
+
+
+
+class RateLimitHeadersTest(unittest.TestCase):
+
+    def test_exhausted_budget_blocks_until_reset(self):
+        bucket = TokenBucket(rpm=100, tpm=100000)
+        bucket.update_from_headers({
+            "x-ratelimit-remaining-requests": "10",
+            "x-ratelimit-reset-requests": "2m59.56s",
+            "x-ratelimit-remaining-tokens": "0",
+            "x-ratelimit-reset-tokens": "100ms",
+        })
+        self.assertAlmostEqual(bucket.reserve(), 0.1, places=1)
+
+    def test_reset_is_capped(self):
+        bucket = TokenBucket(rpm=100, tpm=100000)
+        bucket.update_from_headers({
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "2m59.56s",
+        })
+        self.assertAlmostEqual(bucket.reserve(), MAX_RATE_LIMIT_BACKOFF, places=1)
+
+    def test_retry_after_header(self):
+        bucket = TokenBucket(rpm=100, tpm=100000)
+        bucket.update_from_headers({"retry-after": "3"})
+        self.assertAlmostEqual(bucket.reserve(), 3.0, places=1)
+
+    def test_malformed_headers_are_ignored(self):
+        bucket = TokenBucket(rpm=100, tpm=100000)
+        bucket.update_from_headers({
+            "x-ratelimit-remaining-tokens": "n/a",
+            "x-ratelimit-reset-tokens": "soon",
+        })
+        self.assertEqual(bucket.reserve(), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
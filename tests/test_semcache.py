@@ -0,0 +1,81 @@
+"""Offline tests for the semantic LLM response cache."""
+
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from agents import _semcache
+from agents._semcache import SemanticCache
+
+
+def fake_embed(text):
+    """Unit vectors that only depend on whether the text mentions 'rag'."""
+    return (1.0, 0.0) if "rag" in text else (0.0, 1.0)
+
+
+class SemanticCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        patcher = mock.patch.object(_semcache, "embed", side_effect=fake_embed)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = self.make_cache()
+
+    def make_cache(self, **kwargs):
+        options = {"path": os.path.join(self.tmp.name, "cache.sqlite3"), "threshold": 0.9,
+                   "ttl": 3600, "enabled": True}
+        options.update(kwargs)
+        return SemanticCache(**options)
+
+    def test_exact_and_normalized_match(self):
+        self.cache.set("planner", "What is RAG?", {"plan": 1})
+        self.assertEqual(self.cache.get("planner", "what  is rag?"), {"plan": 1})
+
+    def test_semantic_match(self):
+        self.cache.set("planner", "explain rag systems", {"plan": 1})
+        self.assertEqual(self.cache.get("planner", "how does rag work"), {"plan": 1})
+        self.assertIsNone(self.cache.get("planner", "history of rome"))
+
+    def test_namespace_and_key_isolation(self):
+        self.cache.set("session-a:planner", "rag", {"plan": 1}, key="abc")
+        self.assertIsNone(self.cache.get("session-b:planner", "rag", key="abc"))
+        self.assertIsNone(self.cache.get("session-a:planner", "rag", key="other"))
+        self.assertEqual(self.cache.get("session-a:planner", "rag", key="abc"), {"plan": 1})
+
+    def test_expired_entries_miss(self):
+        cache = self.make_cache(ttl=60)
+        with mock.patch.object(_semcache.time, "time", return_value=1000.0):
+            cache.set("planner", "rag", {"plan": 1})
+        with mock.patch.object(_semcache.time, "time", return_value=1061.0):
+            self.assertIsNone(cache.get("planner", "rag"))
+
+    def test_disabled_cache(self):
+        cache = self.make_cache(enabled=False)
+        cache.set("planner", "rag", {"plan": 1})
+        self.assertIsNone(cache.get("planner", "rag"))
+
+    def test_embedding_failure_is_best_effort(self):
+        with mock.patch.object(_semcache, "embed", side_effect=OSError("offline")):
+            self.cache.set("planner", "rag", {"plan": 1})
+            self.assertEqual(self.cache.get("planner", "rag"), {"plan": 1})
+            self.assertIsNone(self.cache.get("planner", "other query"))
+
+    def test_database_failure_is_best_effort(self):
+        cache = self.make_cache(path=os.path.join(self.tmp.name, "missing", "\0bad"))
+        cache.set("planner", "rag", {"plan": 1})
+        self.assertIsNone(cache.get("planner", "rag"))
+
+    def test_async_variants(self):
+        async def roundtrip():
+            await self.cache.aset("planner", "rag", {"plan": 1})
+            return await self.cache.aget("planner", "rag")
+
+        self.assertEqual(asyncio.run(roundtrip()), {"plan": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
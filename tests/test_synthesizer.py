@@ -0,0 +1,35 @@
+"""Offline tests for the synthesizer's source deduplication."""
+
+import unittest
+
+from agents.synthesizer import _source_key
+
+
+def dedupe(sources):
+    unique = {}
+    for source in sources:
+        unique.setdefault(_source_key(source), source)
+    return list(unique.values())
+
+
+class SourceKeyTest(unittest.TestCase):
+
+    def test_same_url_is_merged(self):
+        a = {"title": "RAG", "url": "https://x", "snippet": "one"}
+        b = {"title": "Other title", "url": "https://x", "snippet": "two"}
+        self.assertEqual(dedupe([a, b]), [a])
+
+    def test_without_url_title_and_snippet_must_both_match(self):
+        a = {"title": "Retrieval-augmented generation", "url": None, "snippet": "RAG is..."}
+        b = {"title": "Retrieval-augmented generation", "url": None, "snippet": "Another article"}
+        c = dict(a)
+        self.assertEqual(dedupe([a, b, c]), [a, b])
+
+    def test_sources_without_identity_are_kept(self):
+        a = {"url": None, "source_type": "web"}
+        b = {"url": None, "source_type": "wikipedia"}
+        self.assertEqual(dedupe([a, b]), [a, b])
+
+
+if __name__ == "__main__":
+    unittest.main()
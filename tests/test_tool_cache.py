@@ -0,0 +1,194 @@
+"""Offline tests for the search tool result caches."""
+
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from tools import _cache
+from tools._cache import ToolCache, cached_tool, memory_cached, single_flight
+
+
+class CountingTool:
+    """Fake search tool that records its calls and returns canned results in order."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = []
+
+    def __call__(self, query, max_results=None):
+        self.calls.append((query, max_results))
+        return self.results[min(len(self.calls), len(self.results)) - 1]
+
+
+class ToolCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "nested", "tools.sqlite3")
+        self.cache = ToolCache(path=self.path, ttl=60, enabled=True)
+
+    def test_round_trip(self):
+        self.assertIsNone(self.cache.get("tavily", "rag", 5))
+        self.cache.set("tavily", "rag", 5, [{"title": "RAG", "url": "https://x"}])
+        self.assertEqual(self.cache.get("tavily", "rag", 5), [{"title": "RAG", "url": "https://x"}])
+        # Every part of the key matters
+        self.assertIsNone(self.cache.get("tavily", "rag", 3))
+        self.assertIsNone(self.cache.get("wikipedia", "rag", 5))
+
+    def test_entries_survive_a_new_connection(self):
+        self.cache.set("arxiv", "rag", 0, [{"title": "Paper"}])
+        self.assertEqual(ToolCache(path=self.path, ttl=60).get("arxiv", "rag", 0), [{"title": "Paper"}])
+
+    def test_expired_entries_are_misses(self):
+        with mock.patch.object(_cache.time, "time", return_value=1000.0):
+            self.cache.set("tavily", "rag", 5, [{"title": "RAG"}])
+        with mock.patch.object(_cache.time, "time", return_value=1061.0):
+            self.assertIsNone(self.cache.get("tavily", "rag", 5))
+
+    def test_errors_are_not_stored(self):
+        self.cache.set("tavily", "rag", 5, {"error": "down"})
+        self.cache.set("tavily", "rag", 3, [{"title": "ok"}, {"error": "partial"}])
+        self.assertIsNone(self.cache.get("tavily", "rag", 5))
+        self.assertIsNone(self.cache.get("tavily", "rag", 3))
+
+    def test_disabled_cache_stores_nothing(self):
+        cache = ToolCache(path=self.path, ttl=60, enabled=False)
+        cache.set("tavily", "rag", 5, [{"title": "RAG"}])
+        self.assertIsNone(cache.get("tavily", "rag", 5))
+        self.assertFalse(os.path.exists(self.path))
+
+
+class CachedToolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        cache = ToolCache(path=os.path.join(self.tmp.name, "tools.sqlite3"), ttl=60, enabled=True)
+        patcher = mock.patch.object(_cache, "get_tool_cache", return_value=cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_repeat_queries_skip_the_tool(self):
+        tool = CountingTool([{"title": "RAG"}])
+        search = cached_tool("tavily")(tool)
+
+        self.assertEqual(search("What is RAG?"), [{"title": "RAG"}])
+        self.assertEqual(search("what  is rag?"), [{"title": "RAG"}])
+        self.assertEqual(len(tool.calls), 1)
+        search("What is RAG?", max_results=2)
+        self.assertEqual(tool.calls[-1], ("What is RAG?", 2))
+
+    def test_errors_are_retried(self):
+        tool = CountingTool([{"error": "down"}], [{"title": "RAG"}])
+        search = cached_tool("tavily")(tool)
+
+        self.assertEqual(search("rag"), [{"error": "down"}])
+        self.assertEqual(search("rag"), [{"title": "RAG"}])
+        self.assertEqual(search("rag"), [{"title": "RAG"}])
+        self.assertEqual(len(tool.calls), 2)
+
+
+class MemoryCachedTest(unittest.TestCase):
+
+    def test_hits_are_private_copies(self):
+        tool = CountingTool([{"title": "RAG", "tags": []}])
+        search = memory_cached()(tool)
+
+        first = search("What is RAG?")
+        first[0]["tags"].append("mutated")
+        self.assertEqual(search("what is  rag?"), [{"title": "RAG", "tags": []}])
+        self.assertEqual(len(tool.calls), 1)
+
+    def test_max_results_is_part_of_the_key(self):
+        tool = CountingTool([{"title": "RAG"}])
+        search = memory_cached()(tool)
+        search("rag")
+        search("rag", max_results=2)
+        self.assertEqual(len(tool.calls), 2)
+
+    def test_errors_are_not_cached(self):
+        tool = CountingTool({"error": "down"}, [{"title": "RAG"}])
+        search = memory_cached()(tool)
+        self.assertEqual(search("rag"), {"error": "down"})
+        self.assertEqual(search("rag"), [{"title": "RAG"}])
+        self.assertEqual(search("rag"), [{"title": "RAG"}])
+        self.assertEqual(len(tool.calls), 2)
+
+    def test_entries_expire_and_are_evicted(self):
+        tool = CountingTool([{"title": "RAG"}])
+        search = memory_cached(maxsize=1, ttl=0.05)(tool)
+        search("rag")
+        time.sleep(0.1)
+        search("rag")
+        self.assertEqual(len(tool.calls), 2)
+        search("other")
+        search("rag")
+        self.assertEqual(len(tool.calls), 4)
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def test_concurrent_identical_calls_share_one_request(self):
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        @single_flight
+        def search(query, max_results=None):
+            calls.append(query)
+            started.set()
+            release.wait(5)
+            return [{"title": "RAG"}]
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            leader = pool.submit(search, "What is RAG?")
+            started.wait(5)
+            followers = [pool.submit(search, "what  is rag?") for _ in range(3)]
+            # Give the followers time to join the in-flight call
+            time.sleep(0.05)
+            release.set()
+            results = [leader.result()] + [f.result() for f in followers]
+
+        self.assertEqual(calls, ["What is RAG?"])
+        self.assertTrue(all(r == [{"title": "RAG"}] for r in results))
+        # Followers get copies, not the leader's list
+        self.assertEqual(len({id(r) for r in results}), len(results))
+
+    def test_sequential_calls_are_not_coalesced(self):
+        tool = CountingTool([{"title": "a"}], [{"title": "b"}])
+        search = single_flight(tool)
+        self.assertEqual(search("rag"), [{"title": "a"}])
+        self.assertEqual(search("rag"), [{"title": "b"}])
+
+    def test_exceptions_reach_every_caller_and_clear_the_key(self):
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        @single_flight
+        def search(query, max_results=None):
+            calls.append(query)
+            if len(calls) == 1:
+                started.set()
+                release.wait(5)
+                raise RuntimeError("down")
+            return [{"title": "RAG"}]
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(search, "rag")
+            started.wait(5)
+            follower = pool.submit(search, "rag")
+            time.sleep(0.05)
+            release.set()
+            for future in (leader, follower):
+                with self.assertRaises(RuntimeError):
+                    future.result()
+
+        self.assertEqual(search("rag"), [{"title": "RAG"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
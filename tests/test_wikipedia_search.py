@@ -0,0 +1,142 @@
+"""Offline tests for the Wikipedia search tool."""
+
+import importlib
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import wikipedia
+
+# tools/__init__.py re-exports the function under the module's name
+wiki = importlib.import_module("tools.wikipedia_search")
+
+# The undecorated search, so the memory and disk caches stay out of the way
+search = wiki.wikipedia_search.__wrapped__.__wrapped__
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response."""
+
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise wiki.requests.HTTPError(f"{self.status_code} error")
+
+
+def rest_summary(title, extract, type_="standard"):
+    return FakeResponse({
+        "type": type_,
+        "title": title,
+        "extract": extract,
+        "content_urls": {"desktop": {"page": f"https://en.wikipedia.org/wiki/{title}"}},
+    })
+
+
+class PerTitleFetchTest(unittest.TestCase):
+    """Titles the batch query misses are fetched concurrently, one at a time."""
+
+    def setUp(self):
+        patcher = mock.patch.object(wiki, "_fetch_batch", return_value={})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_rest_summary_fallbacks_and_ranking_order(self):
+        summaries = {
+            "RAG": rest_summary("RAG", "Retrieval-augmented generation..."),
+            "Mercury": rest_summary("Mercury", "May refer to", type_="disambiguation"),
+            "Broken": FakeResponse({}, status_code=404),
+        }
+
+        def fake_get(url, timeout):
+            return next(response for title, response in summaries.items() if url.endswith("/" + title))
+
+        def fake_page(title, auto_suggest):
+            if title == "Mercury":
+                raise wikipedia.exceptions.DisambiguationError("Mercury", ["Mercury (planet)", "Mercury (element)"])
+            if title == "Mercury (planet)":
+                return SimpleNamespace(title=title, summary="The smallest planet.", url="https://w/Mercury_(planet)")
+            raise wikipedia.exceptions.PageError(title)
+
+        with mock.patch.object(wiki.wikipedia, "search", return_value=["RAG", "Mercury", "Broken"]), \
+                mock.patch.object(wiki._session, "get", side_effect=fake_get), \
+                mock.patch.object(wiki.wikipedia, "page", side_effect=fake_page):
+            results = search("rag")
+
+        self.assertEqual([r["title"] for r in results], ["RAG", "Mercury (planet)"])
+        self.assertEqual(results[1]["summary"], "The smallest planet.")
+        self.assertTrue(all(r["source_type"] == "wikipedia" for r in results))
+
+    def test_long_summaries_are_truncated(self):
+        with mock.patch.object(wiki._session, "get", return_value=rest_summary("RAG", "x" * 900)):
+            result = wiki._fetch("RAG")
+        self.assertEqual(result["summary"], "x" * 800 + "...")
+
+    def test_search_failure_is_an_error_result(self):
+        with mock.patch.object(wiki.wikipedia, "search", side_effect=RuntimeError("offline")):
+            self.assertEqual(search("rag"), [{"error": "Wikipedia search failed: offline"}])
+
+    def test_no_hits(self):
+        with mock.patch.object(wiki.wikipedia, "search", return_value=[]):
+            self.assertEqual(search("zzzz"), [])
+
+
+BATCH_RESPONSE = {
+    "query": {
+        "normalized": [{"from": "rag", "to": "Rag"}],
+        "redirects": [{"from": "Rag", "to": "Retrieval-augmented generation"}],
+        "pages": {
+            "1": {"title": "Retrieval-augmented generation", "extract": "RAG is...",
+                  "fullurl": "https://en.wikipedia.org/wiki/Retrieval-augmented_generation"},
+            "2": {"title": "Mercury", "extract": "Mercury may refer to",
+                  "pageprops": {"disambiguation": ""}},
+            "-1": {"title": "Nonexistent", "missing": ""},
+            "3": {"title": "Large language model", "extract": "An LLM is...",
+                  "fullurl": "https://en.wikipedia.org/wiki/Large_language_model"},
+        },
+    },
+}
+
+
+class BatchFetchTest(unittest.TestCase):
+
+    def test_resolves_normalized_and_redirected_titles(self):
+        with mock.patch.object(wiki._session, "get", return_value=FakeResponse(BATCH_RESPONSE)) as get:
+            found = wiki._fetch_batch(["Large language model", "rag", "Mercury", "Nonexistent"])
+
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(get.call_args.kwargs["params"]["titles"], "Large language model|rag|Mercury|Nonexistent")
+        self.assertEqual(set(found), {"Large language model", "rag"})
+        self.assertEqual(found["rag"]["title"], "Retrieval-augmented generation")
+        self.assertEqual(found["rag"]["url"], "https://en.wikipedia.org/wiki/Retrieval-augmented_generation")
+
+    def test_failures_return_nothing(self):
+        with mock.patch.object(wiki._session, "get", return_value=FakeResponse({}, status_code=503)):
+            self.assertEqual(wiki._fetch_batch(["RAG"]), {})
+        with mock.patch.object(wiki._session, "get", side_effect=wiki.requests.ConnectionError("offline")):
+            self.assertEqual(wiki._fetch_batch(["RAG"]), {})
+
+    def test_only_batch_misses_are_fetched_one_by_one(self):
+        fetched = []
+
+        def fake_fetch(title):
+            fetched.append(title)
+            return {"title": "Mercury (planet)", "summary": "...", "url": None, "source_type": "wikipedia"}
+
+        with mock.patch.object(wiki.wikipedia, "search", return_value=["Mercury", "rag", "Large language model"]), \
+                mock.patch.object(wiki._session, "get", return_value=FakeResponse(BATCH_RESPONSE)), \
+                mock.patch.object(wiki, "_fetch", side_effect=fake_fetch):
+            results = search("rag")
+
+        self.assertEqual(fetched, ["Mercury"])
+        self.assertEqual([r["title"] for r in results],
+                         ["Mercury (planet)", "Retrieval-augmented generation", "Large language model"])
+
+
+if __name__ == "__main__":
+    unittest.main()
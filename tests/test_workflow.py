@@ -0,0 +1,148 @@
+"""Offline tests for the research workflow's fan-out, routing and re-planning."""
+
+import unittest
+from unittest import mock
+
+from langgraph.constants import Send
+
+from graph import workflow
+from graph.workflow import ResearchWorkflow, merge_raw_results, subtask_key
+
+
+class StubVerifier:
+    """Verifier returning a canned verification result."""
+
+    def __init__(self, approved, missing_aspects=()):
+        self.verification = {
+            "approved": approved,
+            "confidence_score": 0.9 if approved else 0.3,
+            "missing_aspects": list(missing_aspects),
+        }
+
+    async def verify_async(self, query, plan, findings):
+        return {"verification": self.verification}
+
+
+def make_workflow(verifier=None):
+    """A workflow with no real agents, so no API keys are needed."""
+    flow = ResearchWorkflow.__new__(ResearchWorkflow)
+    flow.callback = lambda step, message: None
+    flow.section_callback = lambda section: None
+    flow.verifier = verifier
+    return flow
+
+
+def make_state(subtasks, researched=(), iteration=0):
+    findings_index = {subtask_key(s["description"]): i for i, s in enumerate(researched)}
+    return {
+        "query": "What is RAG?",
+        "plan": {"subtasks": list(subtasks)},
+        "raw_results": {},
+        "findings": [{"subtask_id": s["id"]} for s in researched],
+        "findings_index": findings_index,
+        "verification": None,
+        "report": None,
+        "current_step": "verifying",
+        "iteration": iteration,
+        "messages": [],
+        "errors": [],
+    }
+
+
+SUBTASKS = [
+    {"id": 1, "description": "What is retrieval augmented generation"},
+    {"id": 2, "description": "RAG evaluation metrics"},
+]
+
+
+class MergeRawResultsTest(unittest.TestCase):
+
+    def test_parallel_writes_are_merged(self):
+        merged = merge_raw_results({1: {"results": [1]}}, {2: {"results": [2]}})
+        self.assertEqual(merged, {1: {"results": [1]}, 2: {"results": [2]}})
+
+    def test_later_write_wins_and_none_is_empty(self):
+        self.assertEqual(merge_raw_results({1: "old"}, {1: "new"}), {1: "new"})
+        self.assertEqual(merge_raw_results(None, {1: "x"}), {1: "x"})
+        self.assertEqual(merge_raw_results({1: "x"}, None), {1: "x"})
+
+    def test_same_dict_is_returned_unchanged(self):
+        results = {1: "x"}
+        self.assertIs(merge_raw_results(results, results), results)
+
+
+class DispatchResearchTest(unittest.TestCase):
+
+    def test_fans_out_one_send_per_pending_subtask(self):
+        duplicate = {"id": 3, "description": "what is Retrieval  Augmented Generation"}
+        state = make_state(SUBTASKS + [duplicate])
+        sends = make_workflow()._dispatch_research(state)
+
+        self.assertTrue(all(isinstance(send, Send) and send.node == "research" for send in sends))
+        self.assertEqual([send.arg["subtask"]["id"] for send in sends], [1, 2])
+        self.assertEqual([send.arg["total"] for send in sends], [2, 2])
+        # Only the first subtask of the first round collects the prewarmed searches
+        self.assertEqual([send.arg["prewarm"] for send in sends], ["What is RAG?", None])
+
+    def test_follow_up_round_skips_researched_subtasks(self):
+        follow_up = {"id": 3, "description": "Vector databases"}
+        sends = make_workflow()._dispatch_research(make_state(SUBTASKS + [follow_up], researched=SUBTASKS))
+
+        self.assertEqual([send.arg["subtask"]["id"] for send in sends], [3])
+        self.assertIsNone(sends[0].arg["prewarm"])
+
+    def test_nothing_pending_goes_straight_to_summarize(self):
+        self.assertEqual(make_workflow()._dispatch_research(make_state(SUBTASKS, SUBTASKS)), "summarize")
+
+
+class FollowUpSubtasksTest(unittest.TestCase):
+
+    def test_adds_only_new_aspects(self):
+        state = make_state(SUBTASKS, researched=SUBTASKS)
+        added = make_workflow()._add_follow_up_subtasks(
+            state, ["the RAG evaluation metrics", "Vector databases", "vector  databases", "  "])
+
+        self.assertEqual(added, 1)
+        new = state["plan"]["subtasks"][-1]
+        self.assertEqual((new["id"], new["description"]), (3, "Vector databases"))
+
+    def test_ignores_non_string_aspects(self):
+        state = make_state(SUBTASKS, researched=SUBTASKS)
+        added = make_workflow()._add_follow_up_subtasks(
+            state, [None, 42, {"aspect": "x"}, ["y"], "Chunking strategies"])
+
+        self.assertEqual(added, 1)
+        self.assertEqual(state["plan"]["subtasks"][-1]["description"], "Chunking strategies")
+
+
+class VerifyNodeTest(unittest.TestCase):
+
+    def test_approved_goes_to_synthesis(self):
+        state = make_workflow(StubVerifier(True))._verify_node(make_state(SUBTASKS, SUBTASKS))
+        self.assertEqual(state["current_step"], "synthesizing")
+        self.assertEqual(state["iteration"], 0)
+
+    def test_rejected_with_new_aspects_researches_only_those(self):
+        flow = make_workflow(StubVerifier(False, ["Vector databases", None]))
+        state = flow._verify_node(make_state(SUBTASKS, SUBTASKS))
+
+        self.assertEqual(state["current_step"], "executing")
+        self.assertEqual(state["iteration"], 1)
+        self.assertEqual([s["description"] for s in flow._pending_subtasks(state)], ["Vector databases"])
+
+    def test_rejected_without_new_aspects_proceeds(self):
+        flow = make_workflow(StubVerifier(False, ["RAG evaluation metrics"]))
+        state = flow._verify_node(make_state(SUBTASKS, SUBTASKS))
+        self.assertEqual(state["current_step"], "synthesizing")
+
+    def test_retries_are_capped(self):
+        flow = make_workflow(StubVerifier(False, ["Vector databases"]))
+        with mock.patch.object(workflow, "MAX_VERIFICATION_RETRIES", 2):
+            state = flow._verify_node(make_state(SUBTASKS, SUBTASKS, iteration=1))
+
+        self.assertEqual(state["current_step"], "synthesizing")
+        self.assertEqual(len(state["plan"]["subtasks"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
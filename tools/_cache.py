@@ -0,0 +1,201 @@
+"""Persistent SQLite cache for search tool results.
+
+Search results for an identical (tool, query, max_results) call are reused
+across reruns and sessions until they expire, so repeat queries skip the
+network round trip and do not spend API quota. Hot queries are also kept in
+a small in-memory TTL cache, and identical calls made at the same time can
+share one request (single flight).
+"""
+
+import copy
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import orjson
+from cachetools import TTLCache
+
+from config import TOOL_CACHE_ENABLED, TOOL_CACHE_PATH, TOOL_CACHE_TTL
+
+
+def _is_error(result: Any) -> bool:
+    """Whether a tool result reports a failure (those are never cached)."""
+    if isinstance(result, dict):
+        return "error" in result
+    if isinstance(result, list):
+        return any(isinstance(r, dict) and "error" in r for r in result)
+    return False
+
+
+class ToolCache:
+    """SQLite-backed key/value store for tool results with a TTL."""
+
+    def __init__(self, path: str = TOOL_CACHE_PATH, ttl: int = TOOL_CACHE_TTL,
+                 enabled: bool = TOOL_CACHE_ENABLED):
+        self.path = path
+        self.ttl = ttl
+        self.enabled = enabled
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database lazily and create the schema on first use."""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS tool_cache (
+                    tool TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    max_results INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (tool, query, max_results)
+                )
+            """)
+            self._conn.commit()
+        return self._conn
+
+    def get(self, tool: str, query: str, max_results: int) -> Optional[Any]:
+        """Return an unexpired cached result, or None on a miss."""
+        if not self.enabled:
+            return None
+
+        try:
+            with self._lock:
+                row = self._connect().execute(
+                    "SELECT payload FROM tool_cache "
+                    "WHERE tool = ? AND query = ? AND max_results = ? AND created_at >= ?",
+                    (tool, query, max_results, time.time() - self.ttl),
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Tool cache read error: {e}")
+            return None
+
+        return orjson.loads(row[0]) if row else None
+
+    def set(self, tool: str, query: str, max_results: int, result: Any):
+        """Store a successful tool result and drop expired entries."""
+        if not self.enabled or _is_error(result):
+            return
+
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("DELETE FROM tool_cache WHERE created_at < ?", (now - self.ttl,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO tool_cache (tool, query, max_results, payload, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (tool, query, max_results, orjson.dumps(result).decode(), now),
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Tool cache write error: {e}")
+
+
+@lru_cache(maxsize=1)
+def get_tool_cache() -> ToolCache:
+    """Return the process-wide tool cache."""
+    return ToolCache()
+
+
+def cached_tool(name: str) -> Callable:
+    """
+    Decorate a search tool so its results are cached on disk.
+
+    Args:
+        name: Tool name used as part of the cache key
+
+    Returns:
+        Decorator wrapping a tool(query, max_results=None) function
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(query: str, max_results: int = None):
+            key = " ".join(query.lower().split())
+            size = max_results or 0
+            cache = get_tool_cache()
+
+            cached = cache.get(name, key, size)
+            if cached is not None:
+                return cached
+
+            result = func(query, max_results)
+            cache.set(name, key, size, result)
+            return result
+        return wrapper
+    return decorator
+
+
+def memory_cached(maxsize: int = 256, ttl: int = 600) -> Callable:
+    """
+    Decorate a tool with an in-process TTL cache in front of the disk cache.
+
+    Results are copied on the way in and out, so callers can mutate what
+    they get without corrupting the cache. Error results are not cached.
+
+    Args:
+        maxsize: Maximum number of cached (query, max_results) entries
+        ttl: Seconds an entry stays valid
+    """
+    def decorator(func: Callable) -> Callable:
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        lock = threading.Lock()
+
+        @wraps(func)
+        def wrapper(query: str, max_results: int = None):
+            key = (" ".join(query.lower().split()), max_results)
+            with lock:
+                cached = cache.get(key)
+            if cached is not None:
+                return copy.deepcopy(cached)
+
+            result = func(query, max_results)
+            if not _is_error(result):
+                with lock:
+                    cache[key] = copy.deepcopy(result)
+            return result
+        return wrapper
+    return decorator
+
+
+def single_flight(func: Callable) -> Callable:
+    """
+    Decorate a tool so concurrent identical calls share one request.
+
+    The first caller for a (query, max_results) key runs the tool; callers
+    arriving while it is in flight wait for it and get a copy of its result.
+    """
+    inflight: Dict[Tuple[str, Optional[int]], Future] = {}
+    lock = threading.Lock()
+
+    @wraps(func)
+    def wrapper(query: str, max_results: int = None):
+        key = (" ".join(query.lower().split()), max_results)
+        with lock:
+            future = inflight.get(key)
+            leader = future is None
+            if leader:
+                future = inflight[key] = Future()
+
+        if not leader:
+            return copy.deepcopy(future.result())
+
+        try:
+            result = func(query, max_results)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with lock:
+                inflight.pop(key, None)
+    return wrapper
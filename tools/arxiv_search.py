@@ -1,10 +1,58 @@
 """ArXiv scientific paper search tool."""
 
+import xml.etree.ElementTree as ET
+from functools import lru_cache
 from typing import List, Dict, Any
-import arxiv
-from config import MAX_ARXIV_RESULTS
+import httpx
+from config import MAX_ARXIV_RESULTS, TOOL_TIMEOUT
+from tools._cache import cached_tool
 
+ARXIV_API_URL = "https://export.arxiv.org/api/query"
+_ATOM = "{http://www.w3.org/2005/Atom}"
 
+
+@lru_cache(maxsize=1)
+def _client() -> httpx.Client:
+    """Shared HTTP client, so the connection to arXiv is reused across searches."""
+    return httpx.Client(timeout=TOOL_TIMEOUT)
+
+
+def _text(element: ET.Element, tag: str) -> str:
+    """Whitespace-normalized text of a child element ("" if missing)."""
+    child = element.find(_ATOM + tag)
+    return " ".join(child.text.split()) if child is not None and child.text else ""
+
+
+def _parse_feed(feed: str) -> List[Dict[str, Any]]:
+    """Convert an arXiv Atom feed into result dicts."""
+    results = []
+    for entry in ET.fromstring(feed).iter(_ATOM + "entry"):
+        # Format authors
+        names = [_text(author, "name") for author in entry.findall(_ATOM + "author")]
+        authors = ", ".join(names[:3])
+        if len(names) > 3:
+            authors += " et al."
+        
+        pdf_url = next(
+            (link.get("href") for link in entry.findall(_ATOM + "link") if link.get("title") == "pdf"),
+            None,
+        )
+        published = _text(entry, "published")
+        abstract = _text(entry, "summary")
+        
+        results.append({
+            "title": _text(entry, "title"),
+            "authors": authors,
+            "abstract": abstract[:600] + "..." if len(abstract) > 600 else abstract,
+            "url": _text(entry, "id"),
+            "pdf_url": pdf_url,
+            "published": published[:10] or None,
+            "source_type": "arxiv"
+        })
+    return results
+
+
+@cached_tool("arxiv")
 def arxiv_search(query: str, max_results: int = None) -> List[Dict[str, Any]]:
     """
     Search ArXiv for scientific papers.
@@ -12,38 +60,22 @@ def arxiv_search(query: str, max_results: int = None) -> List[Dict[str, Any]]:
     Args:
         query: Search query for papers
         max_results: Maximum number of papers to return
-        
+    
     Returns:
         List of papers with title, authors, abstract, and URL
     """
     max_results = max_results or MAX_ARXIV_RESULTS
     
     try:
-        client = arxiv.Client()
-        search = arxiv.Search(
-            query=query,
-            max_results=max_results,
-            sort_by=arxiv.SortCriterion.Relevance
-        )
-        
-        results = []
-        for paper in client.results(search):
-            # Format authors
-            authors = ", ".join([author.name for author in paper.authors[:3]])
-            if len(paper.authors) > 3:
-                authors += " et al."
-            
-            results.append({
-                "title": paper.title,
-                "authors": authors,
-                "abstract": paper.summary[:600] + "..." if len(paper.summary) > 600 else paper.summary,
-                "url": paper.entry_id,
-                "pdf_url": paper.pdf_url,
-                "published": paper.published.strftime("%Y-%m-%d") if paper.published else None,
-                "source_type": "arxiv"
-            })
-            
-        return results
+        response = _client().get(ARXIV_API_URL, params={
+            "search_query": query,
+            "start": 0,
+            "max_results": max_results,
+            "sortBy": "relevance",
+        })
+        response.raise_for_status()
         
+        return _parse_feed(response.text)
+    
     except Exception as e:
         return [{"error": f"ArXiv search failed: {str(e)}"}]
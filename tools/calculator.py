@@ -1,7 +1,8 @@
 """Safe calculator tool for mathematical expressions."""
 
+import ast
 import math
-import re
+from functools import lru_cache
 from typing import Dict, Any
 
 
@@ -27,6 +28,50 @@ SAFE_FUNCTIONS = {
     'e': math.e,
 }
 
+# Syntax allowed in expressions: arithmetic, numbers, and calls to SAFE_FUNCTIONS
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load,
+    ast.Call, ast.keyword, ast.Tuple, ast.List,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Pow, ast.Mod,
+    ast.USub, ast.UAdd,
+)
+
+
+def _literal_number(expression: str):
+    """Return the value of a plain numeric literal (e.g. "42", "-3.5"), else None."""
+    try:
+        value = ast.literal_eval(expression)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float, complex)):
+        return None
+    return value
+
+
+@lru_cache(maxsize=512)
+def _validate_and_compile(expression: str):
+    """
+    Parse an expression, reject anything outside the whitelist, and compile it.
+    
+    Results are cached, so repeat expressions skip parsing and validation.
+    
+    Raises:
+        ValueError: If the expression uses forbidden syntax or names
+    """
+    tree = ast.parse(expression, mode="eval")
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Expression contains forbidden syntax: {type(node).__name__}")
+        if isinstance(node, ast.Name) and node.id not in SAFE_FUNCTIONS:
+            raise ValueError(f"Unknown name: {node.id}")
+        if isinstance(node, ast.Constant) and (
+            isinstance(node.value, bool) or not isinstance(node.value, (int, float, complex))
+        ):
+            raise ValueError("Only numeric constants are allowed")
+        if isinstance(node, ast.Call) and not isinstance(node.func, ast.Name):
+            raise ValueError("Only calls to math functions are allowed")
+    return compile(tree, "<calc>", "eval")
+
 
 def calculator(expression: str) -> Dict[str, Any]:
     """
@@ -42,18 +87,22 @@ def calculator(expression: str) -> Dict[str, Any]:
         # Clean the expression
         expression = expression.strip()
         
-        # Check for dangerous patterns
-        dangerous_patterns = [
-            r'__', r'import', r'exec', r'eval', r'open', r'file',
-            r'os\.', r'sys\.', r'subprocess', r'compile'
-        ]
+        # Bare numbers need no compile or eval
+        literal = _literal_number(expression)
+        if literal is not None:
+            return {
+                "expression": expression,
+                "result": literal,
+                "source_type": "calculation"
+            }
         
-        for pattern in dangerous_patterns:
-            if re.search(pattern, expression, re.IGNORECASE):
-                return {"error": f"Expression contains forbidden pattern: {pattern}"}
+        # Only whitelisted syntax gets compiled and evaluated
+        try:
+            code = _validate_and_compile(expression)
+        except ValueError as e:
+            return {"error": str(e)}
         
-        # Evaluate with only safe functions
-        result = eval(expression, {"__builtins__": {}}, SAFE_FUNCTIONS)
+        result = eval(code, {"__builtins__": {}}, SAFE_FUNCTIONS)
         
         return {
             "expression": expression,
@@ -1,11 +1,27 @@
 """Safe Python code executor for examples and demonstrations."""
 
+import collections
+import datetime
+import functools
 import io
-import sys
+import itertools
+import json
+import math
+import multiprocessing
+import random
+import re
+import statistics
+import string
 import traceback
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Optional, Tuple
 from contextlib import redirect_stdout, redirect_stderr
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 
 # Allowed modules for import
 ALLOWED_MODULES = {
@@ -13,99 +29,206 @@ ALLOWED_MODULES = {
     'collections', 'datetime', 'json', 're', 'string'
 }
 
+# Builtins exposed to executed code
+_SAFE_BUILTINS = {
+    'print': print,
+    'len': len,
+    'range': range,
+    'str': str,
+    'int': int,
+    'float': float,
+    'list': list,
+    'dict': dict,
+    'tuple': tuple,
+    'set': set,
+    'bool': bool,
+    'type': type,
+    'isinstance': isinstance,
+    'abs': abs,
+    'min': min,
+    'max': max,
+    'sum': sum,
+    'sorted': sorted,
+    'reversed': reversed,
+    'enumerate': enumerate,
+    'zip': zip,
+    'map': map,
+    'filter': filter,
+    'round': round,
+    'pow': pow,
+    'True': True,
+    'False': False,
+    'None': None,
+}
+
+# Globals every snippet starts from; copied per call since exec adds user names
+_RESTRICTED_GLOBALS_TEMPLATE = {
+    '__builtins__': _SAFE_BUILTINS,
+    # Allowed modules
+    'math': math,
+    'random': random,
+    'statistics': statistics,
+    'itertools': itertools,
+    'functools': functools,
+    'collections': collections,
+    'datetime': datetime,
+    'json': json,
+    're': re,
+    'string': string,
+}
+
+# Snippets run in a child process so the timeout can be enforced by killing it.
+# The host process is multithreaded (tool pool, LLM loop, HTTP clients), and a
+# plain fork could inherit a lock held by one of those threads, so children come
+# from a single-threaded fork server instead. It preloads this module, so each
+# child starts without re-importing anything. Windows has no fork server and
+# falls back to spawn.
+if "forkserver" in multiprocessing.get_all_start_methods():
+    _MP_CONTEXT = multiprocessing.get_context("forkserver")
+    _MP_CONTEXT.set_forkserver_preload([__name__])
+else:
+    _MP_CONTEXT = multiprocessing.get_context("spawn")
+
+# Snippets longer than this are compiled fresh rather than cached
+MAX_CACHED_CODE_LENGTH = 8192
+
+# Substrings that reject code outright
+DANGEROUS_PATTERNS = (
+    'open(', 'file(', 'exec(', 'eval(', 'compile(',
+    '__import__', 'subprocess', 'os.system', 'os.popen',
+    'shutil', 'pathlib', 'socket', 'urllib', 'requests',
+    'pickle', 'shelve', 'marshal'
+)
+
+
+def _build_automaton():
+    """Build an Aho-Corasick automaton over DANGEROUS_PATTERNS (None without pyahocorasick)."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for pattern in DANGEROUS_PATTERNS:
+        automaton.add_word(pattern, pattern)
+    automaton.make_automaton()
+    return automaton
+
+
+_AUTOMATON = _build_automaton()
+
+# Fallback when pyahocorasick is missing: one compiled alternation, scanned in C
+_DANGEROUS_RE = re.compile("|".join(map(re.escape, DANGEROUS_PATTERNS)))
+
+
+@lru_cache(maxsize=128)
+def _compile_cached(code: str):
+    """Compile a snippet once; repeated runs reuse the code object."""
+    return compile(code, "<user>", "exec")
+
+
+def _compile(code: str):
+    """Compile a snippet, caching only short ones to bound memory."""
+    if len(code) < MAX_CACHED_CODE_LENGTH:
+        return _compile_cached(code)
+    return compile(code, "<user>", "exec")
+
+
+def _exec_captured(code_obj, restricted_globals: Dict[str, Any]) -> Tuple[str, str]:
+    """Run compiled code, returning what it wrote to stdout and stderr."""
+    stdout_capture = io.StringIO()
+    stderr_capture = io.StringIO()
+    with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
+        exec(code_obj, restricted_globals)
+    return stdout_capture.getvalue(), stderr_capture.getvalue()
+
+
+def find_dangerous_pattern(code: str) -> Optional[str]:
+    """Return the first forbidden pattern found in code, or None if it is clean."""
+    if _AUTOMATON is not None:
+        # One pass over the code for all patterns
+        for _, pattern in _AUTOMATON.iter(code):
+            return pattern
+        return None
+    
+    match = _DANGEROUS_RE.search(code)
+    return match.group() if match else None
+
+
+def _run_snippet(code: str) -> Dict[str, Any]:
+    """Execute a pre-checked snippet with its output captured and build the tool result."""
+    restricted_globals = _RESTRICTED_GLOBALS_TEMPLATE.copy()
+    # Snippets can reach the builtins dict, so they get their own copy too
+    restricted_globals['__builtins__'] = _SAFE_BUILTINS.copy()
+    
+    try:
+        # Always capture: modules (re.DEBUG) and warnings write output too
+        stdout_output, stderr_output = _exec_captured(_compile(code), restricted_globals)
+        
+        return {
+            "output": stdout_output if stdout_output else "Code executed successfully (no output)",
+            "errors": stderr_output if stderr_output else None,
+            "source_type": "python_execution"
+        }
+        
+    except Exception as e:
+        return {
+            "error": f"Execution failed: {str(e)}",
+            "traceback": traceback.format_exc()
+        }
+
+
+def _child_main(code: str, conn):
+    """Child process entry point: run the snippet and send its result back."""
+    try:
+        conn.send(_run_snippet(code))
+    finally:
+        conn.close()
+
 
 def python_executor(code: str, timeout: int = 5) -> Dict[str, Any]:
     """
     Execute Python code in a restricted environment.
     
+    The code runs in a child process, which is killed if it is still
+    running after timeout seconds.
+    
     Args:
         code: Python code to execute
-        timeout: Maximum execution time in seconds
+        timeout: Maximum execution time in seconds (0 or None for no limit)
         
     Returns:
         Dict with output, result, or error
     """
     # Check for dangerous operations
-    dangerous_patterns = [
-        'open(', 'file(', 'exec(', 'eval(', 'compile(',
-        '__import__', 'subprocess', 'os.system', 'os.popen',
-        'shutil', 'pathlib', 'socket', 'urllib', 'requests',
-        'pickle', 'shelve', 'marshal'
-    ]
-    
-    for pattern in dangerous_patterns:
-        if pattern in code:
-            return {"error": f"Code contains forbidden operation: {pattern}"}
-    
-    # Create restricted globals
-    restricted_globals = {
-        '__builtins__': {
-            'print': print,
-            'len': len,
-            'range': range,
-            'str': str,
-            'int': int,
-            'float': float,
-            'list': list,
-            'dict': dict,
-            'tuple': tuple,
-            'set': set,
-            'bool': bool,
-            'type': type,
-            'isinstance': isinstance,
-            'abs': abs,
-            'min': min,
-            'max': max,
-            'sum': sum,
-            'sorted': sorted,
-            'reversed': reversed,
-            'enumerate': enumerate,
-            'zip': zip,
-            'map': map,
-            'filter': filter,
-            'round': round,
-            'pow': pow,
-            'True': True,
-            'False': False,
-            'None': None,
-        }
-    }
-    
-    # Add allowed modules
-    import math, random, statistics, itertools, functools
-    import collections, datetime, json, re, string
-    
-    restricted_globals['math'] = math
-    restricted_globals['random'] = random
-    restricted_globals['statistics'] = statistics
-    restricted_globals['itertools'] = itertools
-    restricted_globals['functools'] = functools
-    restricted_globals['collections'] = collections
-    restricted_globals['datetime'] = datetime
-    restricted_globals['json'] = json
-    restricted_globals['re'] = re
-    restricted_globals['string'] = string
-    
-    # Capture output
-    stdout_capture = io.StringIO()
-    stderr_capture = io.StringIO()
+    pattern = find_dangerous_pattern(code)
+    if pattern:
+        return {"error": f"Code contains forbidden operation: {pattern}"}
     
+    # Syntax errors are reported without starting a process
     try:
-        with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
-            # Execute the code
-            exec(code, restricted_globals)
-        
-        stdout_output = stdout_capture.getvalue()
-        stderr_output = stderr_capture.getvalue()
-        
-        return {
-            "output": stdout_output if stdout_output else "Code executed successfully (no output)",
-            "errors": stderr_output if stderr_output else None,
-            "source_type": "python_execution"
-        }
-        
+        _compile(code)
     except Exception as e:
         return {
             "error": f"Execution failed: {str(e)}",
             "traceback": traceback.format_exc()
         }
+    
+    receiver, sender = _MP_CONTEXT.Pipe(duplex=False)
+    process = _MP_CONTEXT.Process(target=_child_main, args=(code, sender), daemon=True)
+    process.start()
+    sender.close()
+    
+    try:
+        if not receiver.poll(timeout if timeout and timeout > 0 else None):
+            return {"error": f"Execution timed out after {timeout}s"}
+        try:
+            return receiver.recv()
+        except EOFError:
+            process.join()
+            return {"error": f"Execution failed: process exited with code {process.exitcode}"}
+    finally:
+        receiver.close()
+        if process.is_alive():
+            process.terminate()
+            process.join(1)
+            if process.is_alive():
+                process.kill()
+        process.join()
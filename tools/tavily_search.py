@@ -1,10 +1,28 @@
 """Tavily web search tool."""
 
+from functools import lru_cache
 from typing import List, Dict, Any
-from tavily import TavilyClient
-from config import TAVILY_API_KEY, MAX_SEARCH_RESULTS
+import httpx
+import orjson
+from config import TAVILY_API_KEY, MAX_SEARCH_RESULTS, TOOL_TIMEOUT
+from tools._cache import cached_tool, memory_cached, single_flight
 
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
 
+
+@lru_cache(maxsize=1)
+def _client() -> httpx.Client:
+    """Shared HTTP/2 client, so one connection is multiplexed across searches."""
+    return httpx.Client(
+        http2=True,
+        timeout=TOOL_TIMEOUT,
+        headers={"Authorization": f"Bearer {TAVILY_API_KEY}"},
+    )
+
+
+@memory_cached()
+@cached_tool("tavily")
+@single_flight
 def tavily_search(query: str, max_results: int = None) -> List[Dict[str, Any]]:
     """
     Search the web using Tavily API.
@@ -22,13 +40,15 @@ def tavily_search(query: str, max_results: int = None) -> List[Dict[str, Any]]:
     max_results = max_results or MAX_SEARCH_RESULTS
     
     try:
-        client = TavilyClient(api_key=TAVILY_API_KEY)
-        response = client.search(
-            query=query,
-            max_results=max_results,
-            include_answer=True,
-            include_raw_content=False,
-        )
+        http_response = _client().post(TAVILY_SEARCH_URL, json={
+            "query": query,
+            "max_results": max_results,
+            "search_depth": "basic",  # Shorter snippets on the wire
+            "include_answer": True,
+            "include_raw_content": False,
+        })
+        http_response.raise_for_status()
+        response = orjson.loads(http_response.content)
         
         results = []
         
@@ -46,7 +66,7 @@ def tavily_search(query: str, max_results: int = None) -> List[Dict[str, Any]]:
             results.append({
                 "title": result.get("title", "Untitled"),
                 "url": result.get("url", ""),
-                "content": result.get("content", "")[:500],  # Limit content length
+                "content": (result.get("content") or "")[:500],  # Limit content length
                 "source_type": "web"
             })
             
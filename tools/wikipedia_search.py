@@ -1,10 +1,145 @@
 """Wikipedia search and lookup tool."""
 
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+from urllib.parse import quote
+import requests
 import wikipedia
+from requests.adapters import HTTPAdapter
 from config import MAX_WIKI_RESULTS
+from tools._cache import cached_tool, memory_cached
 
 
+# The wikipedia package calls requests.get() for every API request, opening a
+# new connection each time. Its module-level ``requests`` name is swapped for a
+# pooled Session (same .get signature) so fetches reuse keep-alive connections.
+_session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8)
+_session.mount("https://", _adapter)
+_session.mount("http://", _adapter)  # The package's default API_URL is plain http
+wikipedia.wikipedia.requests = _session
+_session.headers["User-Agent"] = "DeepResearchAgent/1.0 (research tool)"
+
+REST_SUMMARY_URL = "https://en.wikipedia.org/api/rest_v1/page/summary/{}"
+ACTION_API_URL = "https://en.wikipedia.org/w/api.php"
+
+
+def _truncate(text: str) -> str:
+    """Cap a summary at 800 characters."""
+    return text[:800] + "..." if len(text) > 800 else text
+
+
+def _fetch_rest_summary(title: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetch an article's lead section from the REST summary endpoint.
+    
+    A few KB of JSON instead of the full article HTML. Returns None for
+    missing pages, disambiguation pages or any failure, so the caller can
+    fall back to the full page lookup.
+    """
+    try:
+        response = _session.get(REST_SUMMARY_URL.format(quote(title.replace(" ", "_"), safe="")), timeout=5)
+        if response.status_code != 200:
+            return None
+        data = response.json()
+    except (requests.RequestException, ValueError):
+        return None
+    
+    if data.get("type") == "disambiguation" or not data.get("extract"):
+        return None
+    
+    return {
+        "title": data.get("title", title),
+        "summary": _truncate(data["extract"]),
+        "url": data.get("content_urls", {}).get("desktop", {}).get("page"),
+        "source_type": "wikipedia"
+    }
+
+
+def _fetch_batch(titles: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch lead-section extracts for several titles in one MediaWiki query.
+    
+    Args:
+        titles: Article titles as returned by wikipedia.search
+        
+    Returns:
+        Results keyed by the requested title. Titles that are missing,
+        disambiguation pages or have no extract are left out, so the caller
+        can fetch those one at a time.
+    """
+    try:
+        response = _session.get(ACTION_API_URL, params={
+            "action": "query",
+            "format": "json",
+            "prop": "extracts|info|pageprops",
+            "exintro": 1,
+            "explaintext": 1,
+            "exlimit": "max",
+            "inprop": "url",
+            "ppprop": "disambiguation",
+            "redirects": 1,
+            "titles": "|".join(titles),
+        }, timeout=5)
+        response.raise_for_status()
+        query = response.json().get("query", {})
+    except (requests.RequestException, ValueError):
+        return {}
+    
+    normalized = {step["from"]: step["to"] for step in query.get("normalized", [])}
+    redirects = {step["from"]: step["to"] for step in query.get("redirects", [])}
+    
+    pages = {}
+    for page in query.get("pages", {}).values():
+        if "missing" in page or "disambiguation" in page.get("pageprops", {}):
+            continue
+        if page.get("extract"):
+            pages[page["title"]] = {
+                "title": page["title"],
+                "summary": _truncate(page["extract"]),
+                "url": page.get("fullurl"),
+                "source_type": "wikipedia"
+            }
+    
+    results = {}
+    for title in titles:
+        # Map each requested title through normalization and redirects
+        resolved = normalized.get(title, title)
+        resolved = redirects.get(resolved, resolved)
+        if resolved in pages:
+            results[title] = pages[resolved]
+    return results
+
+
+def _fetch(title: str) -> Optional[Dict[str, Any]]:
+    """Fetch one article by title, following the first disambiguation option."""
+    summary = _fetch_rest_summary(title)
+    if summary:
+        return summary
+    
+    try:
+        page = wikipedia.page(title, auto_suggest=False)
+    except wikipedia.exceptions.DisambiguationError as e:
+        # If disambiguation, try first option
+        if not e.options:
+            return None
+        try:
+            page = wikipedia.page(e.options[0], auto_suggest=False)
+        except Exception:
+            return None
+    except Exception:
+        return None
+    
+    return {
+        "title": page.title,
+        "summary": _truncate(page.summary),
+        "url": page.url,
+        "source_type": "wikipedia"
+    }
+
+
+@memory_cached()
+@cached_tool("wikipedia")
 def wikipedia_search(query: str, max_results: int = None) -> List[Dict[str, Any]]:
     """
     Search Wikipedia for articles.
@@ -21,36 +156,19 @@ def wikipedia_search(query: str, max_results: int = None) -> List[Dict[str, Any]
     try:
         # Search for page titles
         search_results = wikipedia.search(query, results=max_results)
+        if not search_results:
+            return []
+        
+        # One batched query covers most titles; the rest (disambiguation,
+        # missing extracts) fall back to concurrent per-title fetches
+        found = _fetch_batch(search_results)
+        misses = [title for title in search_results if title not in found]
+        if misses:
+            with ThreadPoolExecutor(max_workers=min(8, len(misses))) as pool:
+                found.update(zip(misses, pool.map(_fetch, misses)))
         
-        results = []
-        for title in search_results:
-            try:
-                page = wikipedia.page(title, auto_suggest=False)
-                results.append({
-                    "title": page.title,
-                    "summary": page.summary[:800] + "..." if len(page.summary) > 800 else page.summary,
-                    "url": page.url,
-                    "source_type": "wikipedia"
-                })
-            except wikipedia.exceptions.DisambiguationError as e:
-                # If disambiguation, try first option
-                if e.options:
-                    try:
-                        page = wikipedia.page(e.options[0], auto_suggest=False)
-                        results.append({
-                            "title": page.title,
-                            "summary": page.summary[:800] + "..." if len(page.summary) > 800 else page.summary,
-                            "url": page.url,
-                            "source_type": "wikipedia"
-                        })
-                    except:
-                        pass
-            except wikipedia.exceptions.PageError:
-                continue
-            except Exception:
-                continue
-                
-        return results
+        # Keep the search ranking order
+        return [found[title] for title in search_results if found.get(title)]
         
     except Exception as e:
         return [{"error": f"Wikipedia search failed: {str(e)}"}]